@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from antispam import simhash
+
+
+def simhash_batch(contents: list[str]) -> list[int]:
+    return [simhash(content) for content in contents]
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Results that missed the budget are never awaited again.
+    if not future.cancelled():
+        future.exception()
+
+
+class ContentAnalyser:
+    """Computes SimHash signatures in worker processes, batching the messages
+    that arrive within ``max_delay`` seconds. Under overload work is shed,
+    never moved back onto the event loop: a signature that misses the
+    latency ``budget``, or is asked for while ``max_in_flight`` messages
+    are already waiting, comes back as None and the caller uses the exact
+    fingerprint instead. With no workers signatures are computed inline."""
+
+    def __init__(
+        self,
+        workers: int,
+        max_batch: int = 64,
+        max_delay: float = 0.005,
+        budget: float = 0.5,
+        max_in_flight: int = 1024,
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.budget = budget
+        self.max_in_flight = max_in_flight
+        self.offloaded = 0
+        self.shed = 0
+        self._in_flight = 0
+        self._pool: Optional[Executor] = None
+        if workers:
+            # Not fork: motor runs threads, and forking a threaded process can
+            # leave the child stuck on a lock held by one of them.
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(workers, mp_context=context)
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def signature(self, content: str) -> Optional[int]:
+        if self._pool is None:
+            return simhash(content)
+        if self._in_flight >= self.max_in_flight:
+            self.shed += 1
+            return None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(_consume)
+        self._in_flight += 1
+        self._pending.append((content, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), self.budget)
+        except Exception:
+            self.shed += 1
+            return None
+        self.offloaded += 1
+        return result
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        work = asyncio.get_running_loop().run_in_executor(
+            self._pool, simhash_batch, [content for content, _ in batch]
+        )
+
+        def settle(done: asyncio.Future):
+            self._in_flight -= len(batch)
+            for i, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if done.cancelled():
+                    future.cancel()
+                elif (error := done.exception()) is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[i])
+
+        work.add_done_callback(settle)
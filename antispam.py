@@ -0,0 +1,340 @@
+import hashlib
+import re
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Hashable, Optional
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    return WHITESPACE_RE.sub(" ", content).strip().casefold()
+
+
+def hash64(data: bytes) -> int:
+    """Stable 64-bit hash, the same in every process and across restarts."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def fingerprint(content: str) -> int:
+    """Fixed-size 64-bit key for the normalized content of a message."""
+    return hash64(normalize_content(content).encode())
+
+
+def simhash(content: str, shingle: int = 4) -> int:
+    """64-bit SimHash over character shingles: messages that only differ by a
+    bit of noise get signatures a few bits apart."""
+    text = normalize_content(content)
+    features = {
+        hash64(text[i : i + shingle].encode())
+        for i in range(max(1, len(text) - shingle + 1))
+    }
+    bits = "".join(f"{f:064b}" for f in features)
+    half = len(features) / 2
+    signature = 0
+    for position in range(64):
+        if bits[position::64].count("1") > half:
+            signature |= 1 << (63 - position)
+    return signature
+
+
+class NearDuplicateIndex:
+    """Maps SimHash signatures to the first similar signature seen, so near
+    duplicates share a key. Signatures are split into bands: two signatures
+    within ``max_distance`` bits always share one band exactly, so a lookup
+    only compares against the few signatures filed under its own bands.
+    ``expire`` forgets signatures that haven't been seen for a while."""
+
+    def __init__(
+        self,
+        bands: int = 8,
+        max_distance: int = 7,
+        capacity: int = 4096,
+        per_band: int = 16,
+    ):
+        self.bands = bands
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.per_band = per_band
+        self._width = 64 // bands
+        self._band_mask = (1 << self._width) - 1
+        self._index: list[dict[int, list[int]]] = [{} for _ in range(bands)]
+        # Signature -> when it was last seen, least recently seen first
+        self._signatures: OrderedDict[int, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @property
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self._signatures) + sum(
+            sys.getsizeof(signature) + sys.getsizeof(seen)
+            for signature, seen in self._signatures.items()
+        )
+        for index in self._index:
+            size += sys.getsizeof(index) + sum(
+                sys.getsizeof(value) + sys.getsizeof(filed)
+                for value, filed in index.items()
+            )
+        return size
+
+    def _bands_of(self, signature: int) -> list[int]:
+        return [
+            (signature >> (band * self._width)) & self._band_mask
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: int) -> int:
+        now = time.monotonic()
+        bands = self._bands_of(signature)
+        for band, value in enumerate(bands):
+            for candidate in self._index[band].get(value, ()):
+                if (candidate ^ signature).bit_count() <= self.max_distance:
+                    self._signatures[candidate] = now
+                    self._signatures.move_to_end(candidate)
+                    return candidate
+
+        self._signatures[signature] = now
+        for band, value in enumerate(bands):
+            filed = self._index[band].setdefault(value, [])
+            filed.append(signature)
+            if len(filed) > self.per_band:
+                del filed[0]
+        if len(self._signatures) > self.capacity:
+            self._forget(self._signatures.popitem(last=False)[0])
+        return signature
+
+    def expire(self, before: float) -> None:
+        """Forgets the signatures last seen before ``before``, a
+        ``time.monotonic()`` value."""
+        signatures = self._signatures
+        while signatures:
+            signature, seen = next(iter(signatures.items()))
+            if seen >= before:
+                break
+            del signatures[signature]
+            self._forget(signature)
+        if not signatures:
+            # Dicts keep their size after deletions, so let an idle guild's
+            # go for good
+            self._index = [{} for _ in range(self.bands)]
+            self._signatures = OrderedDict()
+
+    def _forget(self, signature: int) -> None:
+        for band, value in enumerate(self._bands_of(signature)):
+            filed = self._index[band].get(value)
+            if filed and signature in filed:
+                filed.remove(signature)
+                if not filed:
+                    del self._index[band][value]
+
+
+class ExpiringCache(dict):
+    def __init__(self, seconds: float):
+        self.__ttl: float = seconds
+        self.__insertions: deque[tuple[float, str]] = deque()
+        super().__init__()
+
+    def __verify_cache_integrity(self):
+        # Every entry lives for the same TTL, so insertion order is expiry
+        # order and only the oldest insertions ever need to be looked at.
+        current_time = time.monotonic()
+        insertions = self.__insertions
+        while insertions and current_time > (insertions[0][0] + self.__ttl):
+            t, k = insertions.popleft()
+            entry = super().get(k)
+            if entry is not None and entry[1] == t:
+                super().__delitem__(k)
+
+    def __contains__(self, key: str):
+        self.__verify_cache_integrity()
+        return super().__contains__(key)
+
+    def __getitem__(self, key: str):
+        self.__verify_cache_integrity()
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value):
+        t = time.monotonic()
+        super().__setitem__(key, (value, t))
+        self.__insertions.append((t, key))
+
+    def expire(self):
+        self.__verify_cache_integrity()
+
+
+class SlidingWindow:
+    """Sliding-window rate counter: a key is limited once it gets more than
+    ``rate`` hits within ``per`` seconds. Every key owns ``rate`` slots of
+    one shared ``array('d')`` ring buffer, so recording a hit never
+    allocates once the key has been given a slot."""
+
+    def __init__(self, rate: int, per: float, capacity: int = 4):
+        self.rate = rate
+        self.per = per
+        self._capacity = capacity
+        self._slots: dict[Hashable, int] = {}
+        self._free = list(range(capacity - 1, -1, -1))
+        self._times = array("d", bytes(8 * rate * capacity))
+        self._heads = array("I", bytes(4 * capacity))
+        self._last = array("d", bytes(8 * capacity))
+        self._blank = array("d", bytes(8 * rate))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self._slots)
+            + sys.getsizeof(self._free)
+            + sum(
+                a.itemsize * len(a)
+                for a in (self._times, self._heads, self._last, self._blank)
+            )
+        )
+
+    def _grow(self) -> None:
+        old, new = self._capacity, self._capacity * 2
+        self._times.extend(array("d", bytes(8 * self.rate * old)))
+        self._heads.extend(array("I", bytes(4 * old)))
+        self._last.extend(array("d", bytes(8 * old)))
+        self._free.extend(range(new - 1, old - 1, -1))
+        self._capacity = new
+
+    def _slot(self, key: Hashable) -> int:
+        if (slot := self._slots.get(key)) is None:
+            if not self._free:
+                self._grow()
+            slot = self._slots[key] = self._free.pop()
+            start = slot * self.rate
+            self._times[start : start + self.rate] = self._blank
+            self._heads[slot] = 0
+        return slot
+
+    def hit(self, key: Hashable, current: float) -> bool:
+        """Records a hit at ``current`` and returns whether the key is over
+        its rate."""
+        slot = self._slot(key)
+        head = self._heads[slot]
+        position = slot * self.rate + head
+        oldest = self._times[position]
+        self._times[position] = current
+        self._heads[slot] = head + 1 if head + 1 < self.rate else 0
+        self._last[slot] = current
+        return oldest > 0 and current - oldest < self.per
+
+    def sweep(self, current: float) -> None:
+        """Frees the slots of keys without hits inside the window."""
+        idle = [
+            key
+            for key, slot in self._slots.items()
+            if current - self._last[slot] >= self.per
+        ]
+        for key in idle:
+            self._free.append(self._slots.pop(key))
+
+
+class JoinRateDetector:
+    """Counts joins over the last ``seconds`` with one bucket per second, so
+    each join is O(1) however many arrive. Raid mode starts once the count
+    reaches ``joins`` and only ends after it has stayed under half of that
+    for ``cooldown`` seconds, so it can't flap on a borderline rate."""
+
+    def __init__(self, joins: int, seconds: int, cooldown: float = 120.0):
+        self.cooldown = cooldown
+        self.raiding = False
+        self._calm_since: Optional[float] = None
+        self.configure(joins, seconds)
+
+    def configure(self, joins: int, seconds: int) -> None:
+        if getattr(self, "seconds", None) == seconds:
+            self.joins = joins
+            return
+        self.joins = joins
+        self.seconds = seconds
+        self._counts = array("I", bytes(4 * seconds))
+        self._second = 0
+        self._total = 0
+
+    def _advance(self, second: int) -> None:
+        if second - self._second >= self.seconds:
+            self._counts = array("I", bytes(4 * self.seconds))
+            self._total = 0
+        else:
+            for elapsed in range(self._second + 1, second + 1):
+                bucket = elapsed % self.seconds
+                self._total -= self._counts[bucket]
+                self._counts[bucket] = 0
+        self._second = second
+
+    def rate(self, now: float) -> int:
+        if int(now) > self._second:
+            self._advance(int(now))
+        return self._total
+
+    def record(self, now: float) -> Optional[bool]:
+        """Counts a join. Returns True when raid mode starts, False when it
+        ends and None otherwise."""
+        self.rate(now)
+        self._counts[self._second % self.seconds] += 1
+        self._total += 1
+        return self.check(now)
+
+    def check(self, now: float) -> Optional[bool]:
+        rate = self.rate(now)
+        if not self.raiding:
+            if rate >= self.joins:
+                self.raiding = True
+                self._calm_since = None
+                return True
+        elif rate >= max(1, self.joins // 2):
+            self._calm_since = None
+        elif self._calm_since is None:
+            self._calm_since = now
+        elif now - self._calm_since >= self.cooldown:
+            self.raiding = False
+            self._calm_since = None
+            return False
+        return None
+
+
+class PunishmentTracker:
+    """Tracks punishments in flight or recently applied per key, such as
+    ``(guild, member, category)``, so a burst of hits leads to a single
+    punishment. Hits that arrive while one is in flight are counted."""
+
+    def __init__(self, cooldown: float):
+        self.cooldown = cooldown
+        self._until: dict[Hashable, float] = {}
+        self._hits: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+    def claim(self, key: Hashable, now: float) -> bool:
+        """Returns True if the caller should punish, False if the key is
+        already being or was just punished."""
+        until = self._until.get(key, 0.0)
+        if now < until:
+            # Hits after the release can't be reported anymore
+            if until == float("inf"):
+                self._hits[key] = self._hits.get(key, 0) + 1
+            return False
+        self._until[key] = float("inf")
+        self._hits[key] = 0
+        return True
+
+    def release(self, key: Hashable, now: float) -> int:
+        """Ends the punishment started by ``claim`` and returns how many hits
+        were coalesced into it."""
+        self._until[key] = now + self.cooldown
+        return self._hits.pop(key, 0)
+
+    def sweep(self, now: float) -> None:
+        expired = [key for key, until in self._until.items() if now >= until]
+        for key in expired:
+            del self._until[key]
+            self._hits.pop(key, None)
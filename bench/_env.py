@@ -0,0 +1,19 @@
+"""Lets the benchmarks and tests import the bot's modules: puts the repo
+root on the path, runs from it since langs/ and cogs/ are loaded relative
+to it, and gives MotorClient a URI to parse when constants has none. The
+client only connects on first use, so nothing needs a database until a
+query is made."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import constants
+
+constants.MONGODB_CONNECTION_URI = (
+    constants.MONGODB_CONNECTION_URI or "mongodb://localhost:27017"
+)
@@ -0,0 +1,74 @@
+"""Event loop lag while a flood of messages is hashed inline, against the
+same flood sent to ContentAnalyser's worker processes. A probe sleeps
+10 ms in a loop and records how late it wakes up.
+
+    python bench/analysis_flood.py [messages per second] [seconds]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import _env
+
+from analysis import ContentAnalyser
+from constants import ANALYSIS_WORKERS
+
+TICK = 0.01
+SPAM = "free nitro giveaway click the link below to claim your prize " * 3
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def flood(workers: int, rate: int, seconds: int) -> None:
+    analyser = ContentAnalyser(workers)
+    # Start the workers before measuring
+    await analyser.signature(SPAM)
+    await asyncio.sleep(1.5)
+
+    lag: list[float] = []
+    running = True
+
+    async def probe():
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag.append(time.perf_counter() - started - TICK)
+
+    prober = asyncio.create_task(probe())
+    tasks = []
+    for tick in range(int(seconds / TICK)):
+        for i in range(int(rate * TICK)):
+            content = f"{SPAM}{tick * 1000 + i}"
+            tasks.append(asyncio.create_task(analyser.signature(content)))
+        await asyncio.sleep(TICK)
+    await asyncio.gather(*tasks)
+    running = False
+    await prober
+    analyser.close()
+
+    lag.sort()
+    print(
+        f"{workers:>8} {percentile(lag, 0.5) * 1e3:>7.1f} ms"
+        f" {percentile(lag, 0.99) * 1e3:>7.1f} ms {lag[-1] * 1e3:>7.1f} ms"
+        f" {analyser.offloaded:>10} {analyser.shed:>7}"
+    )
+
+
+def main():
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"{rate:,} messages/s for {seconds} s, {os.cpu_count()} CPU")
+    print(
+        f"{'workers':>8} {'lag p50':>10} {'p99':>10} {'max':>10}"
+        f" {'offloaded':>10} {'shed':>7}"
+    )
+    for workers in (0, ANALYSIS_WORKERS):
+        asyncio.run(flood(workers, rate, seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Embeds built per second by embed_info with the cached bot footer,
+against the helper it replaced, which read ``display_avatar.url`` on every
+call, and against copying a prototype embed.
+
+    python bench/embeds.py
+"""
+
+import timeit
+from types import SimpleNamespace
+
+import _env
+
+from discord import ClientUser, Embed
+from discord.utils import utcnow
+
+from utils import EMBED_COLOR, embed_info
+
+CALLS = 200_000
+
+
+def uncached(object_: tuple, message: str) -> Embed:
+    bot, user = object_
+    author = user.name
+    bot_name = bot.user.name
+    icon = bot.user.display_avatar.url
+    embed = Embed(description=message, color=EMBED_COLOR, timestamp=utcnow())
+    embed.set_footer(icon_url=icon, text=f"{bot_name} | {author}")
+    return embed
+
+
+def main():
+    bot_user = ClientUser(
+        state=SimpleNamespace(),
+        data={
+            "id": "1061380227546771547",
+            "username": "Security",
+            "discriminator": "0",
+            "avatar": "a_d5efa99b3eeaa7dd43acca82f5692432",
+            "bot": True,
+        },
+    )
+    object_ = (SimpleNamespace(user=bot_user), SimpleNamespace(name="member"))
+    prototype = embed_info(object_)
+
+    def copied(object_: tuple, message: str) -> Embed:
+        embed = prototype.copy()
+        embed.description = message
+        embed.timestamp = utcnow()
+        return embed
+
+    for name, build in (
+        ("before", uncached),
+        ("cached footer", embed_info),
+        ("prototype copy", copied),
+    ):
+        footer = build(object_, "Done").to_dict()["footer"]
+        assert footer == prototype.to_dict()["footer"]
+        elapsed = timeit.timeit(lambda: build(object_, "Done"), number=CALLS)
+        print(f"{name:>15} {CALLS / elapsed / 1e3:>7,.0f}k embeds/s")
+
+
+if __name__ == "__main__":
+    main()
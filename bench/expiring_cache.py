@@ -0,0 +1,68 @@
+"""Membership checks on ExpiringCache at 10k, 100k and 1M entries, against
+the old implementation that walked every entry on each check.
+
+    python bench/expiring_cache.py
+"""
+
+import time
+import timeit
+
+import _env
+
+from antispam import ExpiringCache
+
+SIZES = (10_000, 100_000, 1_000_000)
+FULL_SCAN_MAX = 100_000  # The old cache is too slow to time past this
+
+
+class FullScanCache(dict):
+    """ExpiringCache as it was before, for comparison."""
+
+    def __init__(self, seconds: float):
+        self.__ttl: float = seconds
+        super().__init__()
+
+    def __verify_cache_integrity(self):
+        current_time = time.monotonic()
+        to_remove = [
+            k for (k, (v, t)) in self.items() if current_time > (t + self.__ttl)
+        ]
+        for k in to_remove:
+            del self[k]
+
+    def __contains__(self, key):
+        self.__verify_cache_integrity()
+        return super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, (value, time.monotonic()))
+
+
+def per_check(cache: dict, size: int, number: int) -> float:
+    keys = [i * 7919 % (2 * size) for i in range(number)]  # Half are hits
+
+    def run():
+        for key in keys:
+            key in cache
+
+    return timeit.timeit(run, number=1) / number * 1e6
+
+
+def main():
+    print(f"{'entries':>9} {'full scan':>12} {'deque':>10}")
+    for size in SIZES:
+        old = "-"
+        if size <= FULL_SCAN_MAX:
+            cache = FullScanCache(1800.0)
+            for member in range(size):
+                cache[member] = True
+            old = f"{per_check(cache, size, 20):.0f} us"
+        cache = ExpiringCache(1800.0)
+        for member in range(size):
+            cache[member] = True
+        new = per_check(cache, size, 200_000)
+        print(f"{size:>9} {old:>12} {new:>7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
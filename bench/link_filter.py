@@ -0,0 +1,76 @@
+"""Cost per message of the link filter as the blocklist grows, against the
+old ``word in list`` scan.
+
+    python bench/link_filter.py
+"""
+
+import os
+import random
+import string
+import tempfile
+import timeit
+
+import _env
+
+from linkfilter import CompiledIndex, DomainIndex, compile_index, extract_hosts
+
+SIZES = (10_000, 100_000, 1_000_000)
+LIST_SCAN_MAX = 100_000  # The old scan is too slow to time past this
+
+MESSAGES = [
+    "hey check out https://www.google.com/search?q=discord and tell me",
+    "free nitro here [claim](https://gift.{blocked}/redeem) hurry!!",
+    "lol that was so funny, see you tomorrow at the usual place",
+    "<https://github.com/Rapptz/discord.py> has the docs, also docs.python.org",
+]
+
+
+def random_domain(rng: random.Random) -> str:
+    name = "".join(rng.choices(string.ascii_lowercase + string.digits, k=12))
+    return f"{name}.{rng.choice(('com', 'net', 'xyz', 'club', 'gift'))}"
+
+
+def per_message(check, messages: list[str], number: int) -> float:
+    def run():
+        for message in messages:
+            check(message)
+
+    return timeit.timeit(run, number=number) / (number * len(messages)) * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    domains = [random_domain(rng) for _ in range(max(SIZES))]
+    messages = [m.format(blocked=domains[0]) for m in MESSAGES]
+    print(f"{'domains':>9} {'list scan':>12} {'set':>10} {'mmap index':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            blocked = domains[:size]
+            index = DomainIndex(blocked)
+            path = os.path.join(tmp, f"{size}.bin")
+            compile_index(blocked, path)
+            compiled = CompiledIndex(path)
+
+            def search(links):
+                def check(content: str):
+                    for host in extract_hosts(content):
+                        if links.lookup(host) is not None:
+                            return True
+                    return False
+
+                return check
+
+            scan = "-"
+            if size <= LIST_SCAN_MAX:
+                words = list(blocked)
+                scan_us = per_message(
+                    lambda c: any(w in words for w in c.split(" ")), messages, 5
+                )
+                scan = f"{scan_us:.0f} us"
+            set_us = per_message(search(index), messages, 20_000)
+            mmap_us = per_message(search(compiled), messages, 20_000)
+            print(f"{size:>9} {scan:>12} {set_us:>7.2f} us {mmap_us:>9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
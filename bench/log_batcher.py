@@ -0,0 +1,58 @@
+"""Sends a burst of log entries through LogBatcher into a fake channel and
+prints the messages it would post. The channel rejects messages over
+Discord's limits like Discord does. Long entries stand in for free-text
+warn reasons.
+
+    python bench/log_batcher.py [entries] [characters per entry]
+"""
+
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import _env
+
+from discord import Embed, HTTPException
+
+from enforcement import LogBatcher
+
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self):
+        self.messages: list[list[Embed]] = []
+
+    async def send(self, embeds: list[Embed]):
+        if len(embeds) > 10 or sum(map(len, embeds)) > 6000:
+            raise HTTPException(
+                SimpleNamespace(status=400, reason="Bad Request"),
+                "Embed size exceeds maximum size of 6000",
+            )
+        self.messages.append(embeds)
+
+
+async def main(entries: int, characters: int):
+    channel = FakeChannel()
+    batcher = LogBatcher(
+        lambda _, count: Embed(description=f"+{count} more punishments"), delay=0.01
+    )
+    for i in range(entries):
+        batcher.log(channel, Embed(description=f"entry {i} ".ljust(characters, "x")))
+    while batcher._channels:
+        await asyncio.sleep(0.01)
+
+    for number, embeds in enumerate(channel.messages, 1):
+        summary = [e.description for e in embeds if "more" in e.description]
+        chars = sum(map(len, embeds))
+        print(
+            f"message {number}: {len(embeds)} embeds, {chars} characters"
+            f" {' '.join(summary)}"
+        )
+    print(f"{batcher.sent} embeds sent, {batcher.dropped} entries dropped")
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    characters = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    asyncio.run(main(entries, characters))
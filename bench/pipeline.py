@@ -0,0 +1,101 @@
+"""Messages per second through Security.on_message for a guild with every
+module disabled and for guilds with anti spam, the link filter or both
+enabled. Settings are cached and nothing in the stream is spam, so this
+is the cost of checking ordinary traffic. SimHash runs inline
+(no analysis workers) so each message is timed end to end.
+
+    python bench/pipeline.py
+"""
+
+import asyncio
+import datetime
+import random
+import string
+import time
+from types import SimpleNamespace
+
+import _env
+
+import cogs.security
+from analysis import ContentAnalyser
+from settings import GuildSettings
+from utils import guilds_cache
+
+MESSAGES = 50_000
+AUTHORS = 1_000
+GUILDS = {
+    "disabled": (False, False),
+    "antispam": (True, False),
+    "linkfilter": (False, True),
+    "both": (True, True),
+}
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeMember:
+    bot = False
+    guild_permissions = SimpleNamespace(manage_messages=False)
+    created_at = NOW - datetime.timedelta(days=365)
+    joined_at = NOW - datetime.timedelta(days=30)
+
+    def __init__(self, id: int):
+        self.id = id
+
+
+def stream(guild_id: int) -> list[SimpleNamespace]:
+    rng = random.Random(guild_id)
+    guild = SimpleNamespace(id=guild_id)
+    channels = [SimpleNamespace(id=guild_id * 100 + i) for i in range(10)]
+    authors = [FakeMember(10_000 + i) for i in range(AUTHORS)]
+    messages = []
+    for i in range(MESSAGES):
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            for _ in range(rng.randint(1, 15))
+        ]
+        if i % 10 == 0:
+            words.append(f"https://{words[0]}.example.com/{words[-1]}")
+        messages.append(
+            SimpleNamespace(
+                id=i,
+                guild=guild,
+                channel=rng.choice(channels),
+                author=authors[i % AUTHORS],
+                content=" ".join(words),
+                created_at=NOW + datetime.timedelta(seconds=i * 0.05),
+            )
+        )
+    return messages
+
+
+async def main():
+    cogs.security.Member = FakeMember
+    bot = SimpleNamespace(user=SimpleNamespace(id=1), owner_id=2)
+    security = cogs.security.Security(bot)
+    security.analyser = ContentAnalyser(0)
+
+    print(f"{'guild':>11} {'messages/s':>11} {'per message':>12}")
+    for guild_id, (name, (antispam, linkfilter)) in enumerate(GUILDS.items(), 1):
+        guilds_cache._store(
+            guild_id,
+            GuildSettings(
+                {
+                    "antispam": {"enabled": antispam, "punishments": ["warn"]},
+                    "linkfilter": {"enabled": linkfilter, "punishments": ["warn"]},
+                }
+            ),
+        )
+        messages = stream(guild_id)
+        started = time.perf_counter()
+        for message in messages:
+            await security.on_message(message)
+        elapsed = time.perf_counter() - started
+        assert not security.deleter, "a message was flagged"
+        print(
+            f"{name:>11} {len(messages) / elapsed:>11,.0f}"
+            f" {elapsed / len(messages) * 1e6:>9.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
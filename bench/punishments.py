@@ -0,0 +1,132 @@
+"""Time to ban N raiders from one guild through PunishmentQueue, against
+every raider's handler calling ``guild.ban`` on its own as before. Raiders
+are detected evenly over ``SPREAD`` seconds. The guild is a fake HTTP
+backend with a fixed latency and a per-route rate limit that answers 429
+with ``retry_after`` once it is exceeded. The queue is run once with
+Manage Server, so it may bulk ban, and once with only Ban Members.
+
+    python bench/punishments.py
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import _env
+
+from discord import Forbidden, HTTPException, Object, Permissions
+
+from constants import PUNISHMENT_WORKERS
+from enforcement import PunishmentQueue
+
+RAIDERS = (50, 200, 500)
+LATENCY = 0.02  # Seconds per request
+RATE, PER = 10, 0.25  # Requests allowed per route and window
+SPREAD = 1.0  # Seconds between the first and the last detection
+
+
+class FakeGuild:
+    """Answers ban and bulk_ban like Discord would, one rate-limit bucket
+    per route."""
+
+    def __init__(self, id: int, manage_guild: bool = True):
+        self.id = id
+        self.me = SimpleNamespace(
+            guild_permissions=Permissions(ban_members=True, manage_guild=manage_guild)
+        )
+        self.requests = 0
+        self.rate_limited = 0
+        self.banned: set[int] = set()
+        self._windows: dict[str, tuple[float, int]] = {}
+
+    async def _request(self, route: str) -> None:
+        self.requests += 1
+        await asyncio.sleep(LATENCY)
+        now = time.monotonic()
+        start, used = self._windows.get(route, (now, 0))
+        if now - start >= PER:
+            start, used = now, 0
+        if used >= RATE:
+            self.rate_limited += 1
+            error = HTTPException(
+                SimpleNamespace(status=429, reason="Too Many Requests"),
+                "You are being rate limited.",
+            )
+            error.retry_after = PER - (now - start)
+            raise error
+        self._windows[route] = (start, used + 1)
+
+    async def ban(self, user: Object, *, reason: str) -> None:
+        await self._request("ban")
+        self.banned.add(user.id)
+
+    async def bulk_ban(self, users: list[Object], *, reason: str):
+        if not self.me.guild_permissions.manage_guild:
+            raise Forbidden(
+                SimpleNamespace(status=403, reason="Forbidden"), "Missing Permissions"
+            )
+        await self._request("bulk_ban")
+        self.banned.update(user.id for user in users)
+        return SimpleNamespace(banned=users, failed=[])
+
+
+async def detected(index: int, count: int) -> None:
+    await asyncio.sleep(SPREAD * index / count)
+
+
+async def inline(guild: FakeGuild, raiders: list[Object]) -> None:
+    async def handler(index: int, user: Object):
+        await detected(index, len(raiders))
+        # discord.py sleeps out a 429 and tries again
+        while True:
+            try:
+                return await guild.ban(user, reason="Raid")
+            except HTTPException as e:
+                await asyncio.sleep(e.retry_after)
+
+    await asyncio.gather(*(handler(i, user) for i, user in enumerate(raiders)))
+
+
+async def queued(guild: FakeGuild, raiders: list[Object]) -> None:
+    queue = PunishmentQueue(PUNISHMENT_WORKERS)
+    queue.start()
+
+    async def handler(index: int, user: Object):
+        await detected(index, len(raiders))
+        await queue.ban(guild, user, "Raid")
+
+    try:
+        await asyncio.gather(*(handler(i, user) for i, user in enumerate(raiders)))
+    finally:
+        queue.stop()
+
+
+async def measure(
+    clear, count: int, manage_guild: bool = True
+) -> tuple[float, FakeGuild]:
+    guild = FakeGuild(1, manage_guild)
+    raiders = [Object(id=i) for i in range(count)]
+    started = time.perf_counter()
+    await clear(guild, raiders)
+    elapsed = time.perf_counter() - started
+    assert len(guild.banned) == count
+    return elapsed, guild
+
+
+async def main():
+    print(f"{'raiders':>8} {'':>24} {'time':>9} {'requests':>9} {'429s':>6}")
+    for count in RAIDERS:
+        for name, clear, manage_guild in (
+            ("inline", inline, True),
+            ("queue", queued, True),
+            ("queue, no Manage Server", queued, False),
+        ):
+            elapsed, guild = await measure(clear, count, manage_guild)
+            print(
+                f"{count:>8} {name:>24} {elapsed:>7.2f} s"
+                f" {guild.requests:>9} {guild.rate_limited:>6}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
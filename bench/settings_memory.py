@@ -0,0 +1,55 @@
+"""Memory held by 100k cached guilds as raw Mongo documents (nested dicts
+and lists) and as GuildSettings objects. Each guild is decoded on its
+own, as it would be when read from the database.
+
+    python bench/settings_memory.py [guilds]
+"""
+
+import copy
+import json
+import sys
+import tracemalloc
+
+import _env
+
+from settings import DEFAULT_GUILD_SETTINGS, GuildSettings
+
+
+def document(guild_id: int) -> dict:
+    data = copy.deepcopy(DEFAULT_GUILD_SETTINGS)
+    data["_id"] = guild_id
+    data["logs"] = guild_id * 7 + 1
+    data["linkfilter"]["enabled"] = True
+    data["linkfilter"]["punishments"] = ["warn", "min_mute"]
+    data["antispam"]["enabled"] = guild_id % 2 == 0
+    data["antispam"]["punishments"] = ["warn", "kick"]
+    return data
+
+
+def measure(build, count: int, encoded: list[str]) -> int:
+    tracemalloc.start()
+    cache = {}
+    baseline = tracemalloc.get_traced_memory()[0]
+    for guild_id in range(count):
+        data = json.loads(encoded[guild_id])
+        del data["_id"]
+        cache[guild_id] = build(data)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    encoded = [json.dumps(document(guild_id)) for guild_id in range(count)]
+    print(f"{count:,} guilds")
+    for name, build in (
+        ("nested dicts", lambda data: data),
+        ("GuildSettings", GuildSettings),
+    ):
+        used = measure(build, count, encoded)
+        print(f"{name:>14} {used / 1e6:>7.1f} MB {used / count:>7,.0f} B/guild")
+
+
+if __name__ == "__main__":
+    main()
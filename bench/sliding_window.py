@@ -0,0 +1,62 @@
+"""Cost per hit of SlidingWindow against the commands.CooldownMapping it
+replaced, at the four RaidChecker thresholds and a growing number of live
+keys.
+
+    python bench/sliding_window.py
+"""
+
+import random
+import timeit
+
+import _env
+
+from discord.ext import commands
+
+from antispam import SlidingWindow
+
+THRESHOLDS = {
+    "by_user": (10, 12.0),
+    "by_content": (15, 17.0),
+    "new_user": (30, 35.0),
+    "hit_and_run": (10, 12.0),
+}
+LIVE_KEYS = (100, 1_000, 10_000)
+HITS = 20_000
+
+
+def stream(keys: int) -> list[tuple[int, float]]:
+    """Hits spread over ``keys`` keys, all arriving inside one window so
+    none of them expire while the benchmark runs."""
+    rng = random.Random(keys)
+    start = 1_700_000_000.0
+    return [(rng.randrange(keys), start + i * 1e-4) for i in range(HITS)]
+
+
+def per_hit(hit, hits: list[tuple[int, float]]) -> float:
+    def run():
+        for key, current in hits:
+            hit(key, current)
+
+    return timeit.timeit(run, number=1) / len(hits) * 1e6
+
+
+def main():
+    print(f"{'window':>12} {'keys':>7} {'CooldownMapping':>16} {'SlidingWindow':>14}")
+    for name, (rate, per) in THRESHOLDS.items():
+        for keys in LIVE_KEYS:
+            hits = stream(keys)
+            mapping = commands.CooldownMapping.from_cooldown(rate, per, lambda k: k)
+            # RaidChecker called get_bucket then update_rate_limit on it.
+            old = per_hit(
+                lambda key, current: mapping.get_bucket(key, current).update_rate_limit(
+                    current
+                ),
+                hits,
+            )
+            window = SlidingWindow(rate, per)
+            new = per_hit(window.hit, hits)
+            print(f"{name:>12} {keys:>7} {old:>13.2f} us {new:>11.2f} us")
+
+
+if __name__ == "__main__":
+    main()
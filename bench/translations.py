@@ -0,0 +1,71 @@
+"""Translations per second through the nested-table walk _T used to do,
+the flat-table _T and a bound translator(), for a key without
+placeholders and one with them.
+
+    python bench/translations.py
+"""
+
+import json
+import timeit
+
+import _env
+
+from settings import GuildSettings
+from utils import LANGUAGES, _T, guilds_cache, translator
+
+CALLS = 1_000_000
+GUILD = 1234
+PLAIN = "warnings.display.reason"
+TEMPLATED = ("warnings.punish", {"member": "someone", "reason": "spam"})
+
+
+def load_nested() -> dict[str, dict]:
+    nested = {}
+    for lang in LANGUAGES.values():
+        with open(f"langs/{lang}.json", "r", encoding="utf-8") as f:
+            nested[lang] = json.load(f)
+    return nested
+
+
+nested_translations = load_nested()
+
+
+def nested_T(guild_id: int, key: str, **kwargs) -> str:
+    """_T as it was: walks the nested table and always formats."""
+    lang = guilds_cache.get(guild_id).lang
+    value = nested_translations[lang]
+    for k in key.split("."):
+        value = value[k]
+    return value.format(**kwargs)
+
+
+def per_second(call) -> float:
+    return CALLS / timeit.timeit(call, number=CALLS) / 1e6
+
+
+def main():
+    guilds_cache._store(GUILD, GuildSettings({}))
+    translate = translator(GUILD)
+    key, kwargs = TEMPLATED
+    print(f"{'':>18} {'plain':>10} {'placeholders':>14}")
+    for name, plain, templated in (
+        (
+            "nested walk",
+            lambda: nested_T(GUILD, PLAIN),
+            lambda: nested_T(GUILD, key, **kwargs),
+        ),
+        ("flat _T", lambda: _T(GUILD, PLAIN), lambda: _T(GUILD, key, **kwargs)),
+        (
+            "bound translator",
+            lambda: translate(PLAIN),
+            lambda: translate(key, **kwargs),
+        ),
+    ):
+        assert plain() == _T(GUILD, PLAIN) and templated() == _T(GUILD, key, **kwargs)
+        print(
+            f"{name:>18} {per_second(plain):>7.2f}M/s {per_second(templated):>11.2f}M/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
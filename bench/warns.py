@@ -0,0 +1,118 @@
+"""Warnings stored per second under concurrent load, with the old
+find_one then insert_one/update_one against the single warn_update
+pipeline. It also counts the warnings each scheme actually kept, since the
+old one lost some when two warns for one member raced. Runs against a
+throwaway database on the given server.
+
+    python bench/warns.py [mongodb://localhost:27017]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+import _env
+
+from motor import motor_asyncio
+from pymongo import ReturnDocument
+
+import constants
+from cogs.warnings import warn_update
+
+DATABASE = "security_bench"
+WARNS = 5_000
+MEMBERS = 100
+CONCURRENCY = (1, 10, 100)
+
+
+async def old_warn(warns, guild_id: int, user_id: int, reason: str):
+    if (warn := await warns.find_one({"user": user_id, "guild": guild_id})) is None:
+        warn = {
+            "user": user_id,
+            "guild": guild_id,
+            "0": [reason, datetime.now()],
+        }
+        await warns.insert_one(warn)
+    else:
+        del warn["_id"]
+        del warn["user"]
+        del warn["guild"]
+        num = int(list(warn.keys())[-1]) if warn else -1
+        await warns.update_one(
+            {"user": user_id, "guild": guild_id},
+            {"$set": {str(num + 1): [reason, datetime.now()]}},
+        )
+
+
+async def new_warn(warns, guild_id: int, user_id: int, reason: str):
+    await warns.find_one_and_update(
+        {"guild": guild_id, "user": user_id},
+        warn_update(reason, datetime.now()),
+        projection={"next_id": True},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def old_kept(warns) -> int:
+    kept = 0
+    async for document in warns.find():
+        kept += sum(key.isdigit() for key in document)
+    return kept
+
+
+async def new_kept(warns) -> int:
+    kept = 0
+    async for document in warns.find():
+        kept += len(document["warns"])
+    return kept
+
+
+async def run(warns, warn, concurrency: int) -> float:
+    queue = asyncio.Queue()
+    for n in range(WARNS):
+        queue.put_nowait(n)
+
+    async def client():
+        while not queue.empty():
+            n = queue.get_nowait()
+            await warn(warns, 1, n % MEMBERS, f"Warning {n}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def main():
+    uri = sys.argv[1] if len(sys.argv) > 1 else constants.MONGODB_CONNECTION_URI
+    client = motor_asyncio.AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    db = client[DATABASE]
+    print(f"{WARNS:,} warns over {MEMBERS} members")
+    print(
+        f"{'clients':>8} {'old warns/s':>12} {'kept':>6}"
+        f" {'new warns/s':>12} {'kept':>6}"
+    )
+    try:
+        for concurrency in CONCURRENCY:
+            results = []
+            for warn, kept in ((old_warn, old_kept), (new_warn, new_kept)):
+                await db.warns.drop()
+                if warn is new_warn:
+                    await db.warns.create_index(
+                        [("guild", 1), ("user", 1)], unique=True
+                    )
+                elapsed = await run(db.warns, warn, concurrency)
+                results.append((WARNS / elapsed, await kept(db.warns)))
+            (old_rate, old_count), (new_rate, new_count) = results
+            print(
+                f"{concurrency:>8} {old_rate:>12,.0f} {old_count:>6}"
+                f" {new_rate:>12,.0f} {new_count:>6}"
+            )
+    finally:
+        await client.drop_database(DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,3 @@
-import asyncio
-import os
 import sys
 import time
 import traceback
@@ -7,20 +5,27 @@ import traceback
 from discord import Intents
 from discord.ext import commands
 
+from cluster import ClusterConfig
 from constants import APPLICATION_ID, TOKEN
-from utils import _T, MyBot, embed_fail
+from utils import _T, MyBot, embed_fail, guilds_cache
 
+cluster = ClusterConfig.from_env()
 bot: commands.Bot | MyBot = MyBot(
     command_prefix=commands.when_mentioned,
     intents=Intents.all(),
     application_id=APPLICATION_ID,
+    shard_ids=cluster.shard_ids,
+    shard_count=cluster.shard_count,
+    cluster_id=cluster.cluster_id,
+    cluster_count=cluster.cluster_count,
 )
 bot.start_time = time.time()
 
 
 @bot.event
 async def on_ready():
-    print(f"{bot.user.name}: Bot started successfully.")
+    await guilds_cache.prefetch(guild.id for guild in bot.guilds)
+    print(f"{bot.user.name}: Cluster {cluster.cluster_id} started successfully.")
 
 
 @bot.event
@@ -42,11 +47,6 @@ async def on_command_error(ctx: commands.Context, error: commands.CommandError):
         )
 
 
-async def load_extensions():
-    for extension in os.listdir("cogs"):
-        if extension.endswith(".py"):
-            await bot.load_extension(f"cogs.{extension.removesuffix('.py')}")
-
-
-asyncio.run(load_extensions())
-bot.run(TOKEN)
+# Analysis workers are spawned and import this file without running it
+if __name__ == "__main__":
+    bot.run(TOKEN)
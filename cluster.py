@@ -0,0 +1,140 @@
+import asyncio
+import contextlib
+import json
+import os
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+
+Handler = Callable[[dict], Awaitable[dict]]
+
+
+class ClusterConfig(NamedTuple):
+    cluster_id: int
+    cluster_count: int
+    shard_ids: Optional[list[int]]
+    shard_count: Optional[int]
+
+    @classmethod
+    def from_env(cls) -> "ClusterConfig":
+        """Reads the cluster set by the launcher. Without it the bot runs as
+        a single cluster owning every shard."""
+        if "SHARD_IDS" not in os.environ:
+            return cls(0, 1, None, None)
+        return cls(
+            int(os.environ["CLUSTER_ID"]),
+            int(os.environ["CLUSTER_COUNT"]),
+            [int(shard) for shard in os.environ["SHARD_IDS"].split(",")],
+            int(os.environ["SHARD_COUNT"]),
+        )
+
+    def to_env(self) -> dict[str, str]:
+        return {
+            "CLUSTER_ID": str(self.cluster_id),
+            "CLUSTER_COUNT": str(self.cluster_count),
+            "SHARD_IDS": ",".join(map(str, self.shard_ids)),
+            "SHARD_COUNT": str(self.shard_count),
+        }
+
+
+def split_shards(shard_count: int, cluster_count: int) -> list[list[int]]:
+    """Splits the shards into contiguous ranges, one per cluster."""
+    per_cluster = -(-shard_count // cluster_count)
+    return [
+        list(range(start, min(start + per_cluster, shard_count)))
+        for start in range(0, shard_count, per_cluster)
+    ]
+
+
+def _private_directory(path: str) -> str:
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be owned by this user with mode 0700")
+    return path
+
+
+class ClusterIPC:
+    """Requests between the clusters of one host, as one line of JSON each
+    way over a Unix socket. Cluster N listens on ``cluster-N.sock`` in
+    ``directory`` and answers with the handler registered for the request's
+    ``op``. The directory is 0700 and the sockets 0600, so only the bot's
+    own user can send requests such as ``leave``."""
+
+    def __init__(
+        self,
+        cluster_id: int,
+        cluster_count: int,
+        directory: str,
+        timeout: float = 5.0,
+    ):
+        self.cluster_id = cluster_id
+        self.cluster_count = cluster_count
+        self.directory = directory
+        self.timeout = timeout
+        self.handlers: dict[str, Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _path(self, cluster_id: int) -> str:
+        return os.path.join(self.directory, f"cluster-{cluster_id}.sock")
+
+    async def start(self) -> None:
+        if self.cluster_count > 1 and self._server is None:
+            _private_directory(self.directory)
+            path = self._path(self.cluster_id)
+            self._server = await asyncio.start_unix_server(self._serve, path)
+            os.chmod(path, 0o600)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path(self.cluster_id))
+
+    async def _handle(self, request: dict) -> dict:
+        if (handler := self.handlers.get(request.get("op"))) is None:
+            return {"error": f"Unknown op {request.get('op')!r}"}
+        return await handler(request)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self._handle(json.loads(line))
+                except Exception as e:
+                    response = {"error": repr(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def request(self, cluster_id: int, op: str, **kwargs) -> dict:
+        request = {"op": op, **kwargs}
+        if cluster_id == self.cluster_id:
+            return await self._handle(request)
+
+        async def exchange() -> dict:
+            reader, writer = await asyncio.open_unix_connection(
+                self._path(cluster_id)
+            )
+            try:
+                writer.write(json.dumps(request).encode() + b"\n")
+                await writer.drain()
+                return json.loads(await reader.readline())
+            finally:
+                writer.close()
+
+        return await asyncio.wait_for(exchange(), self.timeout)
+
+    async def broadcast(self, op: str, **kwargs) -> list[Optional[dict]]:
+        """Sends the request to every cluster, this one included. Clusters
+        that can't be reached answer None."""
+        responses = await asyncio.gather(
+            *(self.request(c, op, **kwargs) for c in range(self.cluster_count)),
+            return_exceptions=True,
+        )
+        return [None if isinstance(r, BaseException) else r for r in responses]
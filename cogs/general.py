@@ -22,12 +22,17 @@ from utils import (
     embed_info,
     embed_success,
     get_guild_prefs,
+    guilds_cache,
     is_admin,
     set_default_prefs,
     set_guild_data,
+    writer,
 )
 
 
+SECURITY_MODULES = ("antispam", "linkfilter", "joinwatch")
+
+
 class BugModal(Modal):
     def __init__(self):
         super().__init__(title="Bug report", timeout=180)
@@ -85,12 +90,9 @@ class HelpView(View):
         else:
             for command in self.bot.get_cog(category).get_app_commands():
                 name = f"/{command.name}"
-                if category == "Security":
-                    enabled = (
-                        get_guild_prefs(i.guild_id, command.name)["enabled"]
-                        if command.name != "joinwatch"
-                        else get_guild_prefs(i.guild_id, command.name)
-                    )
+                if category == "Security" and command.name in SECURITY_MODULES:
+                    prefs = get_guild_prefs(i.guild_id, command.name)
+                    enabled = prefs if command.name == "joinwatch" else prefs.enabled
                     name += " ✅" if enabled else " ❌"
                 embed.add_field(name=name, value=command.description)
         await i.response.edit_message(embed=embed)
@@ -99,6 +101,30 @@ class HelpView(View):
 class General(commands.Cog):
     def __init__(self, bot):
         self.bot: MyBot = bot
+        bot.ipc.handlers["stats"] = self.cluster_stats
+        bot.ipc.handlers["leave"] = self.cluster_leave
+
+    async def cog_unload(self):
+        self.bot.ipc.handlers.pop("stats", None)
+        self.bot.ipc.handlers.pop("leave", None)
+
+    async def cluster_stats(self, _) -> dict:
+        bot = self.bot
+        return {
+            "cluster": bot.cluster_id,
+            "shards": sorted(bot.shards),
+            "guilds": len(bot.guilds),
+            "users": len(bot.users),
+            "latency": bot.latency,
+            "memory": psutil.Process().memory_info().rss,
+            "settings": len(guilds_cache),
+        }
+
+    async def cluster_leave(self, request: dict) -> dict:
+        if (guild := self.bot.get_guild(request["guild"])) is None:
+            return {"left": False}
+        await guild.leave()
+        return {"left": True}
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -108,6 +134,10 @@ class General(commands.Cog):
     async def on_guild_join(self, guild: Guild):
         await set_default_prefs(guild.id)
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: Guild):
+        guilds_cache.discard(guild.id)
+
     @commands.command()
     @commands.check(is_admin)
     async def adminhelp(self, ctx: commands.Context):
@@ -117,6 +147,12 @@ class General(commands.Cog):
             name="leave [server_id]", value="The bot leaves the given server"
         )
         embed.add_field(name="info", value="Panel with bot info and performance")
+        embed.add_field(
+            name="reloadlinks", value="Rebuild and reload the link filter list"
+        )
+        embed.add_field(
+            name="raidstats [top]", value="Anti raid buckets and memory per server"
+        )
         await ctx.send(embed=embed)
 
     @commands.command()
@@ -129,9 +165,9 @@ class General(commands.Cog):
     @commands.command()
     @commands.check(is_admin)
     async def leave(self, ctx: commands.Context, guild_id: int):
-        if (guild := self.bot.get_guild(guild_id)) is None:
+        responses = await self.bot.ipc.broadcast("leave", guild=guild_id)
+        if not any(r and r.get("left") for r in responses):
             return await ctx.send(embed=embed_fail(ctx, "Server not found for this ID"))
-        await guild.leave()
         await ctx.send(embed=embed_success(ctx, "Left server successfully"))
 
     @commands.command()
@@ -146,12 +182,27 @@ class General(commands.Cog):
         uptime_str = f"{int(uptime // 3600)} hours, {int((uptime % 3600) // 60)} minutes, and {int(uptime % 60)} seconds"
         embed.add_field(name="Uptime", value=uptime_str, inline=False)
 
-        guild_count = len(bot.guilds)
+        clusters = await bot.ipc.broadcast("stats")
+        stats = [c for c in clusters if c and "error" not in c]
+        guild_count = sum(c["guilds"] for c in stats)
         embed.add_field(name="Guild Count", value=guild_count)
 
-        user_count = len(bot.users)
+        user_count = sum(c["users"] for c in stats)
         embed.add_field(name="User Count", value=user_count)
 
+        lines = []
+        for cluster_id, c in enumerate(clusters):
+            if not c or "error" in c:
+                lines.append(f"#{cluster_id}: unreachable")
+                continue
+            shards = f"{c['shards'][0]}-{c['shards'][-1]}" if c["shards"] else "-"
+            lines.append(
+                f"#{cluster_id} shards {shards}: {c['guilds']} guilds, "
+                f"{c['latency'] * 1000:.0f} ms, {c['memory'] / 2**20:.0f} MiB, "
+                f"{c['settings']} cached settings"
+            )
+        embed.add_field(name="Clusters", value="\n".join(lines), inline=False)
+
         # Calculate bot response time
         start_time = time.time()
         message = await ctx.send("Pinging...")
@@ -168,6 +219,39 @@ class General(commands.Cog):
         memory_usage = psutil.virtual_memory().percent
         embed.add_field(name="Memory Usage", value=f"{memory_usage}%")
 
+        # Guild settings cache
+        embed.add_field(
+            name="Settings Cache",
+            value=f"{len(guilds_cache)}/{guilds_cache.maxsize} guilds\n"
+            f"{guilds_cache.hits} hits, {guilds_cache.misses} loads",
+            inline=False,
+        )
+
+        # Database write queues
+        embed.add_field(
+            name="Write Queues",
+            value="\n".join(
+                f"{name}: {len(queue)} queued, {queue.written} written, "
+                f"{queue.dropped} dropped, "
+                f"{queue.average_latency * 1000:.1f} ms avg / "
+                f"{queue.max_latency * 1000:.0f} ms max flush"
+                for name, queue in writer.queues.items()
+            ),
+            inline=False,
+        )
+
+        # Link filter verdict cache
+        if security := bot.get_cog("Security"):
+            verdicts = security.verdicts
+            lookups = verdicts.hits + verdicts.misses
+            hit_rate = verdicts.hits / lookups * 100 if lookups else 0
+            embed.add_field(
+                name="Link Cache",
+                value=f"{len(verdicts)}/{verdicts.maxsize} entries\n"
+                f"{verdicts.hits} hits, {verdicts.misses} misses ({hit_rate:.1f}%)",
+                inline=False,
+            )
+
         await message.edit(content="", embed=embed)
 
     @app_commands.command(description="Use this command to report bot bugs")
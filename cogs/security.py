@@ -1,8 +1,11 @@
+import asyncio
 import contextlib
 import datetime
+import os
+import sys
 import time
 from collections import defaultdict
-from typing import Iterable, List, MutableMapping, Optional
+from typing import Callable, Iterable, List, MutableMapping, NamedTuple, Optional
 
 from discord import (
     AutoModAction,
@@ -12,6 +15,7 @@ from discord import (
     AutoModTrigger,
     ChannelType,
     Embed,
+    Guild,
     Interaction,
     Member,
     Message,
@@ -19,79 +23,120 @@ from discord import (
     app_commands,
 )
 from discord.components import MISSING, SelectOption
-from discord.errors import Forbidden
-from discord.ext import commands
+from discord.errors import Forbidden, HTTPException, NotFound
+from discord.ext import commands, tasks
 from discord.interactions import Interaction
 from discord.ui import ChannelSelect, Select, View
 from discord.utils import format_dt, utcnow
 
+from antispam import (
+    ExpiringCache,
+    JoinRateDetector,
+    NearDuplicateIndex,
+    PunishmentTracker,
+    SlidingWindow,
+    fingerprint,
+)
+from analysis import ContentAnalyser
+from constants import (
+    ANALYSIS_WORKERS,
+    LINK_CACHE_SIZE,
+    NEAR_DUPLICATE_SPAM,
+    PUNISHMENT_WORKERS,
+)
+from enforcement import DeletionBatcher, PunishmentQueue
+from linkfilter import (
+    CompiledIndex,
+    LinkOverlay,
+    VerdictCache,
+    extract_hosts,
+    load_link_index,
+)
+from settings import Punishment
 from utils import (
     _T,
+    DEFAULT_GUILD_SETTINGS,
     MyBot,
+    add_guild_list_item,
+    bot_footer,
+    embed_fail,
+    embed_info,
     embed_success,
     get_guild_prefs,
     get_punishments,
+    guilds_cache,
+    is_admin,
+    remove_guild_list_item,
     set_guild_data,
+    settings_listeners,
+    translator,
 )
 
 from .warnings import exec_warn
 
 
-# AntiSpam
-class ExpiringCache(dict):
-    def __init__(self, seconds: float):
-        self.__ttl: float = seconds
-        super().__init__()
-
-    def __verify_cache_integrity(self):
-        current_time = time.monotonic()
-        to_remove = [
-            k for (k, (v, t)) in self.items() if current_time > (t + self.__ttl)
-        ]
-        for k in to_remove:
-            del self[k]
-
-    def __contains__(self, key: str):
-        self.__verify_cache_integrity()
-        return super().__contains__(key)
-
-    def __getitem__(self, key: str):
-        self.__verify_cache_integrity()
-        return super().__getitem__(key)
-
-    def __setitem__(self, key: str, value):
-        super().__setitem__(key, (value, time.monotonic()))
-
-
-class CooldownByContent(commands.CooldownMapping):
-    def _bucket_key(self, message: Message) -> tuple[int, str]:
-        return (message.channel.id, message.content)
+LINK_FILTER_PATH = "link_filter.txt"
+CHECKER_IDLE_SECONDS = 1800.0  # Same as the fast joiners memory
+NEAR_DUPLICATE_MIN_LENGTH = 16  # Shorter messages are too noisy for SimHash
+PUNISHMENT_COOLDOWN = 60.0  # A member isn't punished twice for one burst
+PUNISHMENT_COALESCE = 3.0  # Wait for the rest of the burst before logging
 
 
+# AntiSpam
 class RaidChecker:
     """
     1) Checks if a user has spammed more than 10 times in 12 seconds
     2) Checks if the content has been spammed 15 times in 17 seconds.
     3) Checks if new users have spammed 30 times in 35 seconds.
     4) Checks if "fast joiners" have spammed 10 times in 12 seconds.
+    5) Checks if members join faster than the guild's join rate allows.
     """
 
     def __init__(self):
-        self.by_content = CooldownByContent.from_cooldown(
-            15, 17.0, commands.BucketType.member
-        )
-        self.by_user = commands.CooldownMapping.from_cooldown(
-            10, 12.0, commands.BucketType.user
-        )
-        self.last_join: Optional[datetime.datetime] = None
-        self.new_user = commands.CooldownMapping.from_cooldown(
-            30, 35.0, commands.BucketType.channel
+        self.by_content = SlidingWindow(15, 17.0)
+        self.by_user = SlidingWindow(10, 12.0)
+        self.join_rate = JoinRateDetector(
+            DEFAULT_GUILD_SETTINGS["joinrate"]["joins"],
+            DEFAULT_GUILD_SETTINGS["joinrate"]["seconds"],
         )
+        self.invites_paused = False
+        self.new_user = SlidingWindow(30, 35.0)
 
         self.fast_joiners: MutableMapping[int, bool] = ExpiringCache(seconds=1800.0)
-        self.hit_and_run = commands.CooldownMapping.from_cooldown(
-            10, 12, commands.BucketType.channel
-        )
+        self.hit_and_run = SlidingWindow(10, 12.0)
+        self.similar = NearDuplicateIndex()
+        self.last_seen = time.monotonic()
+
+    @property
+    def windows(self) -> tuple[SlidingWindow, ...]:
+        return (self.by_content, self.by_user, self.new_user, self.hit_and_run)
+
+    def sweep(self) -> None:
+        current = time.time()
+        for window in self.windows:
+            window.sweep(current)
+        self.fast_joiners.expire()
+        # Content buckets of older signatures have expired already
+        self.similar.expire(time.monotonic() - self.by_content.per)
+
+    def bucket_count(self) -> int:
+        buckets = sum(len(w) for w in self.windows) + len(self.fast_joiners)
+        return buckets + len(self.similar)
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the counters of this guild."""
+        size = sum(window.nbytes for window in self.windows)
+        size += self.similar.nbytes
+        size += sys.getsizeof(self.fast_joiners)
+        size += sum(sys.getsizeof(k) for k in self.fast_joiners)
+        return size
+
+    def content_key(
+        self, message: Message, signature: Optional[int] = None
+    ) -> tuple[int, int]:
+        if signature is not None:
+            return (message.channel.id, self.similar.find(signature))
+        return (message.channel.id, fingerprint(message.content))
 
     def is_new(self, member: Member) -> bool:
         now = utcnow()
@@ -103,39 +148,61 @@ class RaidChecker:
             and member.joined_at > seven_days_ago
         )
 
-    def is_spamming(self, message: Message) -> bool:
+    def is_spamming(self, message: Message, signature: Optional[int] = None) -> bool:
         if message.guild is None:
             return False
 
+        self.last_seen = time.monotonic()
         current = message.created_at.timestamp()
 
-        if message.author.id in self.fast_joiners:
-            bucket = self.hit_and_run.get_bucket(message)
-            if bucket and bucket.update_rate_limit(current):
-                return True
+        channel_id = message.channel.id
+        if message.author.id in self.fast_joiners and self.hit_and_run.hit(
+            channel_id, current
+        ):
+            return True
 
-        if self.is_new(message.author):
-            new_bucket = self.new_user.get_bucket(message)
-            if new_bucket and new_bucket.update_rate_limit(current):
-                return True
+        if self.is_new(message.author) and self.new_user.hit(channel_id, current):
+            return True
 
-        user_bucket = self.by_user.get_bucket(message)
-        if user_bucket and user_bucket.update_rate_limit(current):
+        if self.by_user.hit(message.author.id, current):
             return True
 
-        content_bucket = self.by_content.get_bucket(message)
-        return bool(content_bucket and content_bucket.update_rate_limit(current))
+        return self.by_content.hit(self.content_key(message, signature), current)
 
-    def is_fast_join(self, member: Member) -> bool:
+    def record_join(
+        self, member: Member, joins: int, seconds: int
+    ) -> Optional[bool]:
+        """Counts the join and returns True when a raid starts, False when it
+        is over and None otherwise. Members joining during a raid are
+        remembered as fast joiners."""
+        self.last_seen = time.monotonic()
+        self.join_rate.configure(joins, seconds)
         joined = member.joined_at or utcnow()
-        if self.last_join is None:
-            self.last_join = joined
-            return False
-        is_fast = (joined - self.last_join).total_seconds() <= 2.0
-        self.last_join = joined
-        if is_fast:
+        transition = self.join_rate.record(joined.timestamp())
+        if self.join_rate.raiding:
             self.fast_joiners[member.id] = True
-        return is_fast
+        return transition
+
+
+class Analysis(NamedTuple):
+    signature: Optional[int]
+    links: tuple[tuple[str, Optional[str]], ...]  # (host, globally blocked)
+
+
+class Detector(NamedTuple):
+    check: Callable[[Message, Analysis], bool]
+    category: str
+    punishments: Punishment
+    reason: str
+
+
+class GuildPipeline(NamedTuple):
+    """A guild's enabled detectors with their punishments resolved, rebuilt
+    only when its settings change."""
+
+    detectors: tuple[Detector, ...]
+    scan_links: bool
+    hash_content: bool
 
 
 # Views
@@ -229,12 +296,13 @@ class ConfigurationView(View):
             "ban": "🔨",
         }
         placeholder = _T(i, "punishments.choose")
+        punishments = get_punishments(i.guild_id, category)
         options = [
             SelectOption(
                 label=_T(i, f"punishments.{action}"),
                 value=action,
                 emoji=emoji,
-                default=action in get_punishments(i.guild_id, category),
+                default=Punishment[action.upper()] in punishments,
             )
             for action, emoji in actions.items()
         ]
@@ -266,28 +334,152 @@ class Security(commands.Cog):
     def __init__(self, bot):
         self.bot: MyBot = bot
         self._spam_check: defaultdict[int, RaidChecker] = defaultdict(RaidChecker)
-        with open("link_filter.txt", "r", encoding="utf-8") as f:
-            self.links: list = f.read().splitlines()
+        self.links: CompiledIndex = load_link_index(LINK_FILTER_PATH)
+        self.verdicts = VerdictCache(self.links, LINK_CACHE_SIZE)
+        self._overlays: dict[int, LinkOverlay] = {}
+        self.punished = PunishmentTracker(PUNISHMENT_COOLDOWN)
+        self.punisher = PunishmentQueue(PUNISHMENT_WORKERS)
+        self.deleter = DeletionBatcher()
+        self.analyser = ContentAnalyser(ANALYSIS_WORKERS)
+        self._pipelines: dict[int, GuildPipeline] = {}
+        settings_listeners.append(self.invalidate_pipeline)
+        self._punish_tasks: set[asyncio.Task] = set()
+
+    async def cog_unload(self):
+        self.watch_links.cancel()
+        self.sweep_checkers.cancel()
+        self.punisher.stop()
+        self.deleter.stop()
+        self.analyser.close()
+        settings_listeners.remove(self.invalidate_pipeline)
+
+    async def reload_links(self, rebuild: bool = False) -> CompiledIndex:
+        # Messages are scanned synchronously, so rebinding the attribute never
+        # interrupts a scan; the old mapping is released once unreferenced.
+        self.links = await asyncio.to_thread(
+            load_link_index, LINK_FILTER_PATH, rebuild
+        )
+        self.verdicts.reset(self.links)
+        return self.links
+
+    def get_overlay(self, guild_id: int) -> LinkOverlay:
+        if (overlay := self._overlays.get(guild_id)) is None:
+            prefs = get_guild_prefs(guild_id, "linkfilter")
+            overlay = self._overlays[guild_id] = LinkOverlay(
+                prefs.blocked, prefs.allowed
+            )
+        return overlay
+
+    @tasks.loop(seconds=30)
+    async def watch_links(self):
+        with contextlib.suppress(OSError):
+            if (
+                os.path.getmtime(LINK_FILTER_PATH) > self.links.mtime
+                or os.path.getmtime(self.links.path) != self.links.mtime
+            ):
+                await self.reload_links()
+
+    @tasks.loop(minutes=5)
+    async def sweep_checkers(self):
+        now = time.monotonic()
+        for guild_id, checker in list(self._spam_check.items()):
+            if checker.join_rate.check(time.time()) is False:
+                await self.resume_invites(guild_id, checker)
+            if (
+                now - checker.last_seen > CHECKER_IDLE_SECONDS
+                and not checker.join_rate.raiding
+            ):
+                del self._spam_check[guild_id]
+                self.invalidate_pipeline(guild_id)
+            else:
+                checker.sweep()
+        self.punished.sweep(now)
+
+    async def pause_invites(self, guild: Guild, checker: RaidChecker):
+        if "COMMUNITY" in guild.features and "INVITES_DISABLED" not in guild.features:
+            with contextlib.suppress(Forbidden):
+                await guild.edit(invites_disabled=True)
+                checker.invites_paused = True
+
+    async def resume_invites(self, guild_id: int, checker: RaidChecker):
+        if not checker.invites_paused:
+            return
+        checker.invites_paused = False
+        if guild := self.bot.get_guild(guild_id):
+            with contextlib.suppress(Forbidden):
+                await guild.edit(invites_disabled=False)
+
+    async def cog_load(self):
+        # Not in on_ready: that waits for every shard to be ready and chunked,
+        # while messages arrive, and get punished, long before.
+        self.watch_links.start()
+        self.sweep_checkers.start()
+        self.punisher.start()
 
     @commands.Cog.listener()
     async def on_ready(self):
         print(f"{self.bot.user.name}: Security extension was loaded successfully.")
 
+    @commands.command()
+    @commands.check(is_admin)
+    async def reloadlinks(self, ctx: commands.Context):
+        start = time.perf_counter()
+        links = await self.reload_links(rebuild=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        await ctx.send(
+            embed=embed_success(
+                ctx, f"Link filter reloaded: {len(links)} domains in {elapsed:.0f} ms"
+            )
+        )
+
+    @commands.command()
+    @commands.check(is_admin)
+    async def raidstats(self, ctx: commands.Context, top: int = 10):
+        usage = sorted(
+            (
+                (checker.memory_usage(), checker.bucket_count(), guild_id)
+                for guild_id, checker in self._spam_check.items()
+            ),
+            reverse=True,
+        )
+        total_bytes = sum(u[0] for u in usage)
+        total_buckets = sum(u[1] for u in usage)
+        embed = embed_info(
+            ctx,
+            f"{len(usage)} guilds tracked, {total_buckets} buckets, "
+            f"{total_bytes / 1024:.1f} KiB",
+        )
+        embed.title = "Anti raid memory"
+        for size, buckets, guild_id in usage[:top]:
+            guild = self.bot.get_guild(guild_id)
+            embed.add_field(
+                name=guild.name if guild else guild_id,
+                value=f"ID: ``{guild_id}``\n{buckets} buckets, {size / 1024:.1f} KiB",
+            )
+        await ctx.send(embed=embed)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: Member):
-        if (channel := get_guild_prefs(member.guild.id, "joinwatch")) == 0:
+        settings = await guilds_cache.load(member.guild.id)
+        checker = self._spam_check[member.guild.id]
+        joinrate = settings.joinrate
+        raid = checker.record_join(member, joinrate.joins, joinrate.seconds)
+        # Joins are counted everywhere so fast joiners are known, but invites
+        # are only paused in guilds that turned raid protection on
+        if raid is True and (settings.joinwatch or settings.antispam.enabled):
+            await self.pause_invites(member.guild, checker)
+        elif raid is False:
+            await self.resume_invites(member.guild.id, checker)
+
+        if (channel := settings.joinwatch) == 0:
             return
         now = utcnow()
         is_new = member.created_at > (now - datetime.timedelta(days=7))
-        checker = self._spam_check[member.guild.id]
-
         title = "Member Joined"
-        if checker.is_fast_join(member):
+        if checker.join_rate.raiding:
             colour = 0xDD5F53
             if is_new:
                 title = "Member Joined (Very New Member)"
-            if "COMMUNITY" in member.guild.features:
-                await member.guild.edit(invites_disabled=True)
         else:
             colour = 0x53DDA4
 
@@ -297,10 +489,8 @@ class Security(commands.Cog):
 
         e = Embed(title=title, colour=colour, timestamp=now)
         e.set_author(name=str(member), icon_url=member.display_avatar.url)
-        e.set_footer(
-            icon_url=self.bot.user.display_avatar.url,
-            text=self.bot.user.name,
-        )
+        bot_name, icon = bot_footer(self.bot.user)
+        e.set_footer(icon_url=icon, text=bot_name)
         e.add_field(name="ID", value=member.id)
         assert member.joined_at is not None
         e.add_field(name="Joined", value=format_dt(member.joined_at, "F"))
@@ -310,99 +500,183 @@ class Security(commands.Cog):
         await self.bot.get_channel(channel).send(embed=e)
 
     async def execute_punishments(
-        self, member: Member, guild_id, punishments, reason: str
+        self,
+        member: Member,
+        guild_id,
+        category: str,
+        punishments: Punishment,
+        reason: str,
+    ):
+        if not punishments:
+            return
+        key = (guild_id, member.id, category)
+        if not self.punished.claim(key, time.monotonic()):
+            return
+        task = asyncio.create_task(self.punish(key, member, punishments, reason))
+        self._punish_tasks.add(task)
+        task.add_done_callback(self._punish_tasks.discard)
+
+    async def punish(
+        self,
+        key: tuple[int, int, str],
+        member: Member,
+        punishments: Punishment,
+        reason: str,
     ):
+        guild_id = key[0]
+        try:
+            punishment_msg = await self.apply_punishments(
+                member, guild_id, punishments, reason
+            )
+            # Keep the punishment claimed a little longer so the rest of the
+            # burst is folded into this log entry instead of triggering new ones.
+            await asyncio.sleep(PUNISHMENT_COALESCE)
+        except (Forbidden, NotFound, LookupError):
+            return
+        except HTTPException as e:
+            # Retries on 429/5xx ran out, or Discord rejected the request
+            print(f"Punishing {member.id} in guild {guild_id} failed: {e}")
+            return
+        finally:
+            hits = self.punished.release(key, time.monotonic())
+
+        if hits:
+            punishment_msg += "\n" + _T(
+                guild_id, "punishments_log.coalesced", count=hits
+            )
+        await self.bot.log((guild_id, self.bot.user), punishment_msg)
+
+    async def apply_punishments(
+        self, member: Member, guild_id, punishments: Punishment, reason: str
+    ) -> str:
+        t = translator(guild_id)
         punishment_msg = None
-        if "warn" in punishments:
+        if Punishment.WARN in punishments:
             await exec_warn(guild_id, member.id, reason)
-            punishment_msg = _T(
-                guild_id,
+            punishment_msg = t(
                 "warnings.punish",
                 member=member.display_name,
                 reason=reason,
             )
-        if "day_mute" in punishments:
-            await member.timeout(datetime.timedelta(days=1))
-            punishment_msg = _T(
-                guild_id,
+        if Punishment.DAY_MUTE in punishments:
+            await self.punisher.run(
+                guild_id, lambda: member.timeout(datetime.timedelta(days=1))
+            )
+            punishment_msg = t(
                 "punishments_log.day_mute",
                 member=member.display_name,
                 reason=reason,
             )
-        elif "hour_mute" in punishments:
-            await member.timeout(datetime.timedelta(hours=1))
-            punishment_msg = _T(
-                guild_id,
+        elif Punishment.HOUR_MUTE in punishments:
+            await self.punisher.run(
+                guild_id, lambda: member.timeout(datetime.timedelta(hours=1))
+            )
+            punishment_msg = t(
                 "punishments_log.hour_mute",
                 member=member.display_name,
                 reason=reason,
             )
-        elif "min_mute" in punishments:
-            await member.timeout(datetime.timedelta(minutes=5))
-            punishment_msg = _T(
-                guild_id,
+        elif Punishment.MIN_MUTE in punishments:
+            await self.punisher.run(
+                guild_id, lambda: member.timeout(datetime.timedelta(minutes=5))
+            )
+            punishment_msg = t(
                 "punishments_log.min_mute",
                 member=member.display_name,
                 reason=reason,
             )
-        if "ban" in punishments:
-            await member.ban(reason=reason)
-            punishment_msg = _T(
-                guild_id,
+        if Punishment.BAN in punishments:
+            await self.punisher.ban(member.guild, member, reason)
+            punishment_msg = t(
                 "punishments_log.ban",
                 member=member.display_name,
                 reason=reason,
             )
-        elif "kick" in punishments:
-            await member.kick(reason=reason)
-            punishment_msg = _T(
-                guild_id,
+        elif Punishment.KICK in punishments:
+            await self.punisher.run(guild_id, lambda: member.kick(reason=reason))
+            punishment_msg = t(
                 "punishments_log.kick",
                 member=member.display_name,
                 reason=reason,
             )
+        return punishment_msg
+
+    def invalidate_pipeline(self, guild_id: int):
+        # Runs on every settings change and cache eviction of the guild
+        self._pipelines.pop(guild_id, None)
+        self._overlays.pop(guild_id, None)
+
+    def compile_pipeline(self, guild_id: int) -> GuildPipeline:
+        detectors = []
+        antispam = get_guild_prefs(guild_id, "antispam")
+        if antispam.enabled:
+            checker = self._spam_check[guild_id]
+            detectors.append(
+                Detector(
+                    lambda m, a: checker.is_spamming(m, a.signature),
+                    "antispam",
+                    antispam.punishments,
+                    "Anti Raid",
+                )
+            )
+        linkfilter = get_guild_prefs(guild_id, "linkfilter")
+        if linkfilter.enabled:
+            overlay = self.get_overlay(guild_id)
+            detectors.append(
+                Detector(
+                    lambda m, a: overlay.judge(a.links) is not None,
+                    "linkfilter",
+                    linkfilter.punishments,
+                    "Link Filter",
+                )
+            )
+        return GuildPipeline(
+            tuple(detectors),
+            scan_links=linkfilter.enabled,
+            hash_content=antispam.enabled and NEAR_DUPLICATE_SPAM,
+        )
 
-        await self.bot.log((guild_id, self.bot.user), punishment_msg)
+    async def analyse(self, message: Message, pipeline: GuildPipeline) -> Analysis:
+        content = message.content
+        links = ()
+        if pipeline.scan_links:
+            links = tuple(
+                (host, self.verdicts.lookup(host)) for host in extract_hosts(content)
+            )
+        signature = None
+        if pipeline.hash_content and len(content) >= NEAR_DUPLICATE_MIN_LENGTH:
+            signature = await self.analyser.signature(content)
+        return Analysis(signature, links)
 
-    async def check_raid(
-        self,
-        guild_id: int,
-        member: Member,
-        message: Message,
-    ) -> None:
-        enabled, punishments = get_guild_prefs(guild_id, "antispam").values()
-        if not enabled:
+    @commands.Cog.listener()
+    async def on_message(self, message: Message):
+        if message.guild is None:
             return
-
-        checker = self._spam_check[guild_id]
-        if not checker.is_spamming(message):
+        guild_id = message.guild.id
+        await guilds_cache.load(guild_id)
+        if (pipeline := self._pipelines.get(guild_id)) is None:
+            pipeline = self._pipelines[guild_id] = self.compile_pipeline(guild_id)
+        if not pipeline.detectors:
             return
 
-        with contextlib.suppress(Forbidden):
-            await self.execute_punishments(member, guild_id, punishments, "Anti Raid")
-
-    @commands.Cog.listener()
-    async def on_message(self, message: Message):
         author = message.author
         if author.id in (self.bot.user.id, self.bot.owner_id):
             return
-        if message.guild is None or not isinstance(author, Member):
-            return
-        if author.bot:
+        if not isinstance(author, Member) or author.bot:
             return
         if author.guild_permissions.manage_messages:
             return
-        guild_id = message.guild.id
 
-        await self.check_raid(guild_id, author, message)
-        if not get_guild_prefs(guild_id, "linkfilter")["enabled"]:
-            return
-        if any(word in self.links for word in message.content.split(" ")):
-            with contextlib.suppress(Forbidden):
-                await message.delete()
+        analysis = await self.analyse(message, pipeline)
+        flagged = False
+        for check, category, punishments, reason in pipeline.detectors:
+            if check(message, analysis):
+                flagged = True
                 await self.execute_punishments(
-                    author, guild_id, get_punishments(guild_id, "linkfilter")
+                    author, guild_id, category, punishments, reason
                 )
+        if flagged:
+            self.deleter.delete(message)
 
     @commands.Cog.listener()
     async def on_automod_action(self, execution: AutoModAction):
@@ -413,10 +687,11 @@ class Security(commands.Cog):
             category = "antispam"
         else:
             return
-        if (punishments := get_punishments(guild_id, category)) == []:
+        await guilds_cache.load(guild_id)
+        if not (punishments := get_punishments(guild_id, category)):
             return
         await self.execute_punishments(
-            execution.member, guild_id, punishments, "Anti Spam"
+            execution.member, guild_id, category, punishments, "Anti Spam"
         )
 
     async def enable_anti_mentionspam(self, i: Interaction, enabled):
@@ -484,6 +759,72 @@ class Security(commands.Cog):
         )
         await self.bot.log(i, msg)
 
+    async def edit_domain_list(
+        self, i: Interaction, list_name: str, domain: str, remove: bool
+    ):
+        await i.response.defer()
+        if (host := next(extract_hosts(domain), None)) is None:
+            return await i.followup.send(
+                embed=embed_fail(i, _T(i, "security.invalid_domain"))
+            )
+
+        field = f"linkfilter.{list_name}"
+        if remove:
+            await remove_guild_list_item(i.guild_id, field, host)
+            msg = _T(i, "security.domain_removed", domain=host, list=list_name)
+        else:
+            await add_guild_list_item(i.guild_id, field, host)
+            msg = _T(i, "security.domain_added", domain=host, list=list_name)
+        await i.followup.send(embed=embed_success(i, msg))
+        await self.bot.log(i, msg)
+
+    @app_commands.command(description="Block a domain in this server's link filter")
+    @app_commands.describe(
+        domain="Domain to block, its subdomains are blocked too",
+        remove="Remove the domain from the list instead",
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions()
+    async def blockdomain(self, i: Interaction, domain: str, remove: bool = False):
+        await self.edit_domain_list(i, "blocked", domain, remove)
+
+    @app_commands.command(
+        description="Allow a domain that the link filter blocks in this server"
+    )
+    @app_commands.describe(
+        domain="Domain to allow, its subdomains are allowed too",
+        remove="Remove the domain from the list instead",
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions()
+    async def allowdomain(self, i: Interaction, domain: str, remove: bool = False):
+        await self.edit_domain_list(i, "allowed", domain, remove)
+
+    @app_commands.command(
+        description="Set how many joins in how many seconds count as a raid"
+    )
+    @app_commands.describe(
+        joins="Joins needed to start raid mode and pause invites",
+        seconds="Time window the joins are counted in",
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions()
+    async def joinrate(
+        self,
+        i: Interaction,
+        joins: app_commands.Range[int, 2, 1000],
+        seconds: app_commands.Range[int, 1, 600],
+    ):
+        await i.response.defer()
+        await set_guild_data(
+            i.guild_id, "joinrate", {"joins": joins, "seconds": seconds}
+        )
+        if (checker := self._spam_check.get(i.guild_id)) is not None:
+            checker.join_rate.configure(joins, seconds)
+        msg = _T(i, "security.joinrate", joins=joins, seconds=seconds)
+        await i.followup.send(embed=embed_success(i, msg))
+        await self.bot.log(i, msg)
+
     @app_commands.command(description="Broadcast new member join in the chosen channel")
     @app_commands.describe(
         suspicious_join_channel="Channel to broadcast new member joins and their potential risk."
@@ -1,29 +1,103 @@
 from datetime import datetime
+from typing import Hashable
 
 from discord import Interaction, Member, app_commands
 from discord.ext import commands
 from discord.utils import format_dt
-
-from utils import _T, MyBot, Paginator, db, embed_fail, embed_success
+from pymongo import ReturnDocument, UpdateOne
+
+from utils import _T, MyBot, Paginator, db, embed_fail, embed_success, writer
+from writes import Request, WriteQueue
+
+
+def warn_update(reason: str, date: datetime) -> list[dict]:
+    """Pipeline update that appends a warning with the member's next ID and
+    advances the counter, atomically and without reading first. Upserting
+    it creates the member's document."""
+    warning = {
+        "id": {"$ifNull": ["$next_id", 0]},
+        "reason": {"$literal": reason},
+        "date": {"$literal": date},
+    }
+    return [
+        {
+            "$set": {
+                "warns": {"$concatArrays": [{"$ifNull": ["$warns", []]}, [warning]]},
+                "next_id": {"$add": [{"$ifNull": ["$next_id", 0]}, 1]},
+            }
+        }
+    ]
+
+
+class WarnQueue(WriteQueue):
+    """Queues the warnings given by punishments, so a raid's warnings go out
+    as one bulk write of atomic appends."""
+
+    def warn(self, guild_id: int, user_id: int, reason: str) -> None:
+        self._push((guild_id, user_id), (reason, datetime.now()))
+
+    async def _requests(self, batch: dict[Hashable, list]) -> list[Request]:
+        return [
+            (
+                (guild_id, user_id),
+                [warn],
+                UpdateOne(
+                    {"guild": guild_id, "user": user_id},
+                    warn_update(*warn),
+                    upsert=True,
+                ),
+            )
+            for (guild_id, user_id), warns in batch.items()
+            for warn in warns
+        ]
+
+
+warn_writes: WarnQueue = writer.add(WarnQueue(db.warns))
+
+
+async def add_warning(guild_id: int, user_id: int, reason: str) -> int:
+    """Stores a warning right away with a single round trip and returns its
+    ID."""
+    warns = await db.warns.find_one_and_update(
+        {"guild": guild_id, "user": user_id},
+        warn_update(reason, datetime.now()),
+        projection={"next_id": True},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return warns["next_id"] - 1
+
+
+async def get_warnings(
+    guild_id: int, user_id: int, skip: int, limit: int
+) -> tuple[list[dict], int]:
+    """Returns one page of a member's warnings and how many they have in
+    total. Only that page leaves the server, however long the history."""
+    warns = db.warns.aggregate(
+        [
+            {"$match": {"guild": guild_id, "user": user_id}},
+            {"$project": {"warns": {"$ifNull": ["$warns", []]}}},
+            {
+                "$project": {
+                    "_id": False,
+                    "page": {"$slice": ["$warns", skip, limit]},
+                    "total": {"$size": "$warns"},
+                }
+            },
+        ]
+    )
+    async for document in warns:
+        return document["page"], document["total"]
+    return [], 0
 
 
 async def exec_warn(guild_id: int, user_id: int, reason: str):
-    if (warns := await db.warns.find_one({"user": user_id, "guild": guild_id})) is None:
-        warns = {
-            "user": user_id,
-            "guild": guild_id,
-            "0": [reason, datetime.now()],
-        }
-        await db.warns.insert_one(warns)
-    else:
-        del warns["_id"]
-        del warns["user"]
-        del warns["guild"]
-        num = int(list(warns.keys())[-1]) if warns else -1
-        await db.warns.update_one(
-            {"user": user_id, "guild": guild_id},
-            {"$set": {str(num + 1): [reason, datetime.now()]}},
-        )
+    warn_writes.warn(guild_id, user_id, reason)
+
+
+async def flush_warns(guild_id: int, user_id: int):
+    if (guild_id, user_id) in warn_writes:
+        await warn_writes.flush()
 
 
 class Warnings(commands.Cog):
@@ -39,7 +113,7 @@ class Warnings(commands.Cog):
     @app_commands.default_permissions()
     async def warn(self, i: Interaction, member: Member, reason: str):
         await i.response.defer()
-        await exec_warn(i.guild_id, member.id, reason)
+        await add_warning(i.guild_id, member.id, reason)
 
         punishment_msg = _T(
             i, "warnings.punish", member=member.display_name, reason=reason
@@ -51,14 +125,12 @@ class Warnings(commands.Cog):
         await i.response.defer()
         if not member:
             member = i.user
-        warns = await db.warns.find_one({"user": member.id, "guild": i.guild_id})
-        if warns:
-            del warns["_id"]
-            del warns["guild"]
-        else:
-            warns = {}
-
-        paginator = Paginator(interaction=i, objects=warns, username=member.name)
+        await flush_warns(i.guild_id, member.id)
+
+        async def fetch(skip: int, limit: int) -> tuple[list[dict], int]:
+            return await get_warnings(i.guild_id, member.id, skip, limit)
+
+        paginator = Paginator(interaction=i, username=member.name, fetch=fetch)
         await paginator.send_message(i)
 
     @app_commands.command(description="Use this command to check a user's warnings")
@@ -77,20 +149,20 @@ class Warnings(commands.Cog):
     @app_commands.default_permissions()
     async def unwarn(self, i: Interaction, member: Member, warn_id: int):
         await i.response.defer()
-        warn_id = str(warn_id)
-        filter_ = {
-            "user": member.id,
-            "guild": i.guild_id,
-            warn_id: {"$exists": True},
-        }
-        if (warn := await db.warns.find_one(filter_)) is None:
+        await flush_warns(i.guild_id, member.id)
+        # Pulls the warning and returns it in one round trip
+        warns = await db.warns.find_one_and_update(
+            {"user": member.id, "guild": i.guild_id, "warns.id": warn_id},
+            {"$pull": {"warns": {"id": warn_id}}},
+            projection={"warns.$": True},
+        )
+        if warns is None:
             return await i.followup.send(
-                embed=embed_fail(i, _T(i, "warning.not_found"))
+                embed=embed_fail(i, _T(i, "warnings.not_found"))
             )
 
-        await db.warns.update_one(filter_, {"$unset": {warn_id: ""}})
-
-        warning = f"ID: ``{warn_id}`` {warn[warn_id][0]}\n{format_dt(warn[warn_id][1])}"
+        warn = warns["warns"][0]
+        warning = f"ID: ``{warn_id}`` {warn['reason']}\n{format_dt(warn['date'])}"
         punishment_msg = _T(
             i, "warnings.unwarn", member=member.display_name, warning=warning
         )
@@ -7,10 +7,22 @@ ADMINS = [12345678, 00000000]  # User ID list
 INVITE_LINK = "https://google.com"
 SUPPORT_SERVER = "https://google.com"
 
+# CLUSTERS
+CLUSTER_COUNT = 1  # Bot processes started by launcher.py
+SHARD_COUNT = 0  # Total shards, 0 uses Discord's recommendation
+IPC_DIRECTORY = "ipc"  # Private directory for the clusters' sockets
+
 # PREFERENCES
 EMBED_COLOR = 0x000
 MAX_CLEAR_AMOUNT = 100  # Maximum amount of messages to delete with /clear
 BUG_REPORT_CHANNEL = 00000000  # Channel ID
+GUILD_CACHE_SIZE = 10000  # Guild settings kept in memory
+WRITE_FLUSH_INTERVAL = 0.5  # Seconds database writes are held back to be batched
+SETTINGS_POLL_INTERVAL = 5  # Seconds between settings polls without change streams
+LINK_CACHE_SIZE = 50000  # Link filter verdicts kept in memory
+NEAR_DUPLICATE_SPAM = True  # Count "same message plus noise" as the same spam
+PUNISHMENT_WORKERS = 4  # Concurrent punishment requests to Discord
+ANALYSIS_WORKERS = 2  # Processes for heavy message analysis, 0 runs it inline
 LANGUAGES = {
     "English": "en"
 }  # Available languages for the bot, these need to be in the "langs" folder too
@@ -0,0 +1,384 @@
+import asyncio
+import datetime
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from discord import Embed, Forbidden, Guild, HTTPException, Message, NotFound
+from discord.abc import Messageable, Snowflake
+from discord.utils import utcnow
+
+BULK_BAN_LIMIT = 200  # Maximum users per bulk ban request
+BULK_DELETE_LIMIT = 100  # Maximum messages per bulk delete request
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=13, hours=23)  # Discord allows < 14 days
+EMBEDS_PER_MESSAGE = 10  # Maximum embeds per message
+EMBED_CHARS_PER_MESSAGE = 6000  # Maximum characters across a message's embeds
+
+
+class _Job:
+    __slots__ = ("factory", "future")
+
+    def __init__(self, factory: Callable[[], Awaitable], future: asyncio.Future):
+        self.factory = factory
+        self.future = future
+
+
+class _Ban:
+    __slots__ = ("user", "reason", "future", "queued_at")
+
+    def __init__(self, user: Snowflake, reason: str, future: asyncio.Future):
+        self.user = user
+        self.reason = reason
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+def _ban_batch_limit(guild: Guild) -> int:
+    """Bulk bans need Manage Server on top of Ban Members. Without it
+    members are banned one at a time."""
+    me = guild.me
+    if me is not None and me.guild_permissions.manage_guild:
+        return BULK_BAN_LIMIT
+    return 1
+
+
+class PunishmentQueue:
+    """Runs punishment API calls on a fixed number of workers. Calls are
+    queued per guild and guilds are served round-robin, so a raided guild
+    can't starve the others. Bans of a guild are held back briefly while
+    its other calls run, and then sent together as bulk bans when the bot
+    may use them."""
+
+    def __init__(
+        self,
+        workers: int,
+        per_guild: int = 2,
+        retries: int = 3,
+        ban_delay: float = 1.0,
+    ):
+        self.workers = workers
+        self.per_guild = per_guild
+        self.retries = retries
+        self.ban_delay = ban_delay
+        self._jobs: dict[int, deque[_Job]] = {}
+        self._bans: dict[int, deque[_Ban]] = {}
+        self._guilds: dict[int, Guild] = {}
+        self._active: dict[int, int] = {}
+        self._ready: deque[int] = deque()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        jobs = sum(map(len, self._jobs.values()))
+        return jobs + sum(map(len, self._bans.values()))
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for queue in (*self._jobs.values(), *self._bans.values()):
+            for pending in queue:
+                pending.future.cancel()
+        self._jobs.clear()
+        self._bans.clear()
+        self._ready.clear()
+
+    def _schedule(self, guild_id: int) -> None:
+        if (
+            guild_id not in self._ready
+            and self._active.get(guild_id, 0) < self.per_guild
+            and (self._jobs.get(guild_id) or self._bans.get(guild_id))
+        ):
+            self._ready.append(guild_id)
+            self._wakeup.set()
+
+    def run(self, guild_id: int, factory: Callable[[], Awaitable]) -> asyncio.Future:
+        """Queues ``factory()`` for the guild and returns a future with its
+        result."""
+        future = asyncio.get_running_loop().create_future()
+        self._jobs.setdefault(guild_id, deque()).append(_Job(factory, future))
+        self._schedule(guild_id)
+        return future
+
+    def ban(self, guild: Guild, user: Snowflake, reason: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._guilds[guild.id] = guild
+        self._bans.setdefault(guild.id, deque()).append(_Ban(user, reason, future))
+        self._schedule(guild.id)
+        return future
+
+    async def _worker(self) -> None:
+        while True:
+            while not self._ready:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            guild_id = self._ready.popleft()
+            if (work := self._take(guild_id)) is None:
+                continue
+            self._active[guild_id] = self._active.get(guild_id, 0) + 1
+            self._schedule(guild_id)
+            try:
+                await work
+            finally:
+                self._active[guild_id] -= 1
+                if not self._active[guild_id]:
+                    del self._active[guild_id]
+                self._schedule(guild_id)
+                if guild_id not in self._active and guild_id not in self._ready:
+                    self._forget(guild_id)
+
+    def _forget(self, guild_id: int) -> None:
+        if not self._jobs.get(guild_id):
+            self._jobs.pop(guild_id, None)
+        if not self._bans.get(guild_id):
+            self._bans.pop(guild_id, None)
+            self._guilds.pop(guild_id, None)
+
+    def _take(self, guild_id: int) -> Optional[Awaitable]:
+        jobs = self._jobs.get(guild_id)
+        bans = self._bans.get(guild_id)
+        if bans:
+            # Let bans pile up while the guild still has other calls going, so
+            # raiders end up in as few bulk bans as possible.
+            wait = self.ban_delay - (time.monotonic() - bans[0].queued_at)
+            busy = jobs or guild_id in self._active
+            limit = _ban_batch_limit(self._guilds[guild_id])
+            if len(bans) >= limit or wait <= 0 or not busy:
+                return self._flush_bans(guild_id, bans)
+            if not jobs:
+                asyncio.get_running_loop().call_later(
+                    wait, self._schedule, guild_id
+                )
+                return None
+        if jobs:
+            job = jobs.popleft()
+            return self._settle(job.future, job.factory)
+        return None
+
+    def _flush_bans(self, guild_id: int, bans: deque[_Ban]) -> Awaitable:
+        guild = self._guilds[guild_id]
+        limit = _ban_batch_limit(guild)
+        reason = bans[0].reason
+        batch: list[_Ban] = []
+        for ban in list(bans):
+            if len(batch) == limit:
+                break
+            if ban.reason == reason:
+                batch.append(ban)
+                bans.remove(ban)
+        return self._bulk_ban(guild, batch, reason)
+
+    async def _bulk_ban(self, guild: Guild, batch: list[_Ban], reason: str) -> None:
+        if len(batch) == 1:
+            await self._settle(
+                batch[0].future, lambda: guild.ban(batch[0].user, reason=reason)
+            )
+            return
+
+        result = asyncio.get_running_loop().create_future()
+        await self._settle(
+            result, lambda: guild.bulk_ban([b.user for b in batch], reason=reason)
+        )
+        if isinstance(result.exception(), Forbidden):
+            # Bulk bans also need Manage Server, which may have been taken
+            # away since the batch was made. Ban Members can still do it.
+            for ban in batch:
+                await self._settle(
+                    ban.future, lambda ban=ban: guild.ban(ban.user, reason=reason)
+                )
+            return
+        if result.exception() is not None:
+            for ban in batch:
+                if not ban.future.done():
+                    ban.future.set_exception(result.exception())
+            return
+        failed = {user.id for user in result.result().failed}
+        for ban in batch:
+            if ban.future.done():
+                continue
+            if ban.user.id in failed:
+                ban.future.set_exception(
+                    LookupError(f"Bulk ban failed for user {ban.user.id}")
+                )
+            else:
+                ban.future.set_result(None)
+
+    async def _settle(
+        self, future: asyncio.Future, factory: Callable[[], Awaitable]
+    ) -> None:
+        error: Optional[BaseException] = None
+        for attempt in range(self.retries + 1):
+            try:
+                result = await factory()
+            except HTTPException as e:
+                error = e
+                if (e.status != 429 and e.status < 500) or attempt == self.retries:
+                    break
+                await asyncio.sleep(getattr(e, "retry_after", None) or 2**attempt)
+            except Exception as e:
+                error = e
+                break
+            else:
+                if not future.done():
+                    future.set_result(result)
+                return
+        if not future.done():
+            future.set_exception(error)
+
+
+class DeletionBatcher:
+    """Collects flagged messages per channel for ``delay`` seconds and then
+    deletes them with bulk requests of up to 100 messages. Messages too old
+    for bulk deletion, or in a bulk request that failed for another reason
+    than permissions, are deleted one by one."""
+
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self._pending: dict[int, dict[int, Message]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._pending.values()))
+
+    def delete(self, message: Message) -> None:
+        if (pending := self._pending.get(message.channel.id)) is None:
+            pending = self._pending[message.channel.id] = {}
+            task = asyncio.create_task(self._flush_later(message.channel))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        pending[message.id] = message
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._pending.clear()
+
+    async def _flush_later(self, channel: Messageable) -> None:
+        await asyncio.sleep(self.delay)
+        messages = list(self._pending.pop(channel.id).values())
+        cutoff = utcnow() - BULK_DELETE_MAX_AGE
+        recent = [m for m in messages if m.created_at > cutoff]
+        single = [m for m in messages if m.created_at <= cutoff]
+
+        # Without permission, or with the channel gone, every other request
+        # would fail the same way, so the rest of the messages are dropped
+        for i in range(0, len(recent), BULK_DELETE_LIMIT):
+            batch = recent[i : i + BULK_DELETE_LIMIT]
+            try:
+                await channel.delete_messages(batch)
+            except (Forbidden, NotFound):
+                return
+            except HTTPException:
+                single.extend(batch)
+        for message in single:
+            try:
+                await message.delete()
+            except Forbidden:
+                return
+            except HTTPException:
+                continue
+
+
+def _message_batches(embeds: list[Embed]) -> list[list[Embed]]:
+    """Splits embeds into messages within Discord's limits on the number
+    of embeds and on the characters across them."""
+    batches: list[list[Embed]] = []
+    batch: list[Embed] = []
+    chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if batch and (
+            len(batch) == EMBEDS_PER_MESSAGE
+            or chars + size > EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(batch)
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class _ChannelLog:
+    __slots__ = ("channel", "embeds", "dropped", "task")
+
+    def __init__(self, channel: Messageable):
+        self.channel = channel
+        self.embeds: list[Embed] = []
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class LogBatcher:
+    """Collects log embeds per channel for ``delay`` seconds and sends them
+    up to 10 and 6000 characters to a message, one message at a time per
+    channel. Past ``max_pending`` queued embeds a channel only counts new
+    entries, and ``summarize(channel, count)`` builds the embed that
+    reports them. ``dropped`` counts those entries and any that failed to
+    send."""
+
+    def __init__(
+        self,
+        summarize: Callable[[Messageable, int], Embed],
+        delay: float = 1.0,
+        max_pending: int = 49,  # Five messages, counting the summary
+    ):
+        self.summarize = summarize
+        self.delay = delay
+        self.max_pending = max_pending
+        self.sent = 0
+        self.dropped = 0
+        self._channels: dict[int, _ChannelLog] = {}
+
+    def __len__(self) -> int:
+        return sum(len(log.embeds) for log in self._channels.values())
+
+    def log(self, channel: Messageable, embed: Embed) -> None:
+        if (log := self._channels.get(channel.id)) is None:
+            log = self._channels[channel.id] = _ChannelLog(channel)
+        if len(log.embeds) < self.max_pending:
+            log.embeds.append(embed)
+        else:
+            log.dropped += 1
+        if log.task is None:
+            log.task = asyncio.create_task(self._drain(log))
+
+    def stop(self) -> None:
+        for log in self._channels.values():
+            if log.task is not None:
+                log.task.cancel()
+        self._channels.clear()
+
+    async def _drain(self, log: _ChannelLog) -> None:
+        try:
+            while log.embeds:
+                await asyncio.sleep(self.delay)
+                embeds, log.embeds = log.embeds, []
+                if log.dropped:
+                    self.dropped += log.dropped
+                    embeds.append(self.summarize(log.channel, log.dropped))
+                    log.dropped = 0
+                batches = _message_batches(embeds)
+                for i, batch in enumerate(batches):
+                    try:
+                        await log.channel.send(embeds=batch)
+                    except (Forbidden, NotFound):
+                        # Channel deleted or no longer writable
+                        unsent = sum(map(len, batches[i:])) + len(log.embeds)
+                        self.dropped += unsent + log.dropped
+                        log.embeds.clear()
+                        return
+                    except HTTPException:
+                        self.dropped += len(batch)
+                        continue
+                    self.sent += len(batch)
+        finally:
+            if self._channels.get(log.channel.id) is log:
+                del self._channels[log.channel.id]
@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import os
+import signal
+import sys
+import time
+
+import aiohttp
+
+from cluster import ClusterConfig, split_shards
+from constants import CLUSTER_COUNT, SHARD_COUNT, TOKEN
+
+IDENTIFY_DELAY = 5.0  # Seconds between shard logins, Discord's identify limit
+STABLE_AFTER = 60.0  # A cluster up this long restarts without backoff
+MAX_BACKOFF = 60.0
+SHUTDOWN_TIMEOUT = 30.0
+
+
+async def recommended_shards() -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {TOKEN}"},
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+async def pause(stopping: asyncio.Event, seconds: float) -> None:
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(stopping.wait(), seconds)
+
+
+async def supervise(config: ClusterConfig, delay: float, stopping: asyncio.Event):
+    """Runs one cluster process and restarts it whenever it exits, waiting
+    longer after each crash that follows a short run."""
+    await pause(stopping, delay)
+    backoff = 1.0
+    while not stopping.is_set():
+        started = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "bot.py", env={**os.environ, **config.to_env()}
+        )
+        waiter = asyncio.create_task(process.wait())
+        stopper = asyncio.create_task(stopping.wait())
+        await asyncio.wait((waiter, stopper), return_when=asyncio.FIRST_COMPLETED)
+        if stopping.is_set():
+            # SIGINT lets the bot close cleanly and flush its queued writes
+            with contextlib.suppress(ProcessLookupError):
+                process.send_signal(signal.SIGINT)
+            try:
+                await asyncio.wait_for(waiter, SHUTDOWN_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            return
+        stopper.cancel()
+
+        if time.monotonic() - started >= STABLE_AFTER:
+            backoff = 1.0
+        print(
+            f"Cluster {config.cluster_id} exited with code {process.returncode}, "
+            f"restarting in {backoff:.0f}s"
+        )
+        await pause(stopping, backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+async def main():
+    shard_count = SHARD_COUNT or await recommended_shards()
+    ranges = split_shards(shard_count, CLUSTER_COUNT)
+    print(f"Launching {len(ranges)} clusters for {shard_count} shards")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    # Stagger the clusters so their shards don't identify at the same time
+    clusters = []
+    delay = 0.0
+    for cluster_id, shard_ids in enumerate(ranges):
+        config = ClusterConfig(cluster_id, len(ranges), shard_ids, shard_count)
+        clusters.append(supervise(config, delay, stopping))
+        delay += len(shard_ids) * IDENTIFY_DELAY
+    await asyncio.gather(*clusters)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+from array import array
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+# A match may only start where a token starts. Without the lookbehind a
+# long run of letters with no dot is retried from every position, which
+# is quadratic in the message length.
+HOST_RE = re.compile(r"(?<![^\W_]|-)(?:[^\W_]|-)+(?:\.(?:[^\W_]|-)+)+")
+
+
+def normalize_host(host: str) -> str:
+    return host.lower().strip(".-")
+
+
+def extract_hosts(content: str) -> Iterator[str]:
+    """Yields every host-like token in the message, wherever it is placed
+    (bare, after a scheme or userinfo, inside markdown links or <>). This
+    is one pass over the message, linear in its length, and each host is
+    then looked up by its label suffixes rather than matched against the
+    list."""
+    for match in HOST_RE.finditer(content):
+        if host := normalize_host(match.group()):
+            yield host
+
+
+class DomainIndex:
+    """Hashed set of blocked domains. A host matches when any of its
+    label suffixes is in the set, so ``evil.com`` also blocks
+    ``www.evil.com`` and ``a.b.evil.com``."""
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self.domains: set[str] = {
+            host for d in domains if (host := normalize_host(d.strip()))
+        }
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def __contains__(self, host: str) -> bool:
+        return self.lookup(host) is not None
+
+    def add(self, domain: str) -> None:
+        self.domains.add(normalize_host(domain))
+
+    def discard(self, domain: str) -> None:
+        self.domains.discard(normalize_host(domain))
+
+    def lookup(self, host: str) -> Optional[str]:
+        domains = self.domains
+        if host in domains:
+            return host
+        start = host.find(".")
+        while start != -1:
+            suffix = host[start + 1 :]
+            if suffix in domains:
+                return suffix
+            start = host.find(".", start + 1)
+        return None
+
+
+INDEX_MAGIC = b"SBLH0001"
+INDEX_HEADER = struct.Struct("<8sQQ")  # magic, slots, domains
+
+
+def domain_hash(domain: str) -> int:
+    digest = hashlib.blake2b(domain.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1  # 0 marks an empty slot
+
+
+def compile_index(domains: Iterable[str], path: str) -> None:
+    """Writes the domains as an open-addressed table of their 64-bit hashes,
+    kept under half full so lookups probe one or two slots."""
+    hashes = {
+        domain_hash(host) for d in domains if (host := normalize_host(d.strip()))
+    }
+    slots = 1 << max(4, (2 * len(hashes)).bit_length())
+    mask = slots - 1
+    table = array("Q", bytes(8 * slots))
+    for value in hashes:
+        i = value & mask
+        while table[i]:
+            i = (i + 1) & mask
+        table[i] = value
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, slots, len(hashes)))
+        table.tofile(f)
+    os.replace(tmp, path)
+
+
+class CompiledIndex:
+    """Read-only view of an index written by ``compile_index``. It matches
+    like ``DomainIndex``, one hashed lookup per label suffix of the host.
+    The file is memory-mapped, so it loads in milliseconds and every bot
+    process on the host shares the same pages."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, slots, self.size = INDEX_HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a compiled link index")
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        start = INDEX_HEADER.size
+        self._table = memoryview(self._map)[start : start + slots * 8].cast("Q")
+        self._mask = slots - 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, domain: str) -> bool:
+        value = domain_hash(domain)
+        table, mask = self._table, self._mask
+        i = value & mask
+        while slot := table[i]:
+            if slot == value:
+                return True
+            i = (i + 1) & mask
+        return False
+
+    def lookup(self, host: str) -> Optional[str]:
+        if host in self:
+            return host
+        start = host.find(".")
+        while start != -1:
+            suffix = host[start + 1 :]
+            if suffix in self:
+                return suffix
+            start = host.find(".", start + 1)
+        return None
+
+
+def _read_list(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def load_link_index(source: str, rebuild: bool = False) -> CompiledIndex:
+    """Maps the compiled index next to ``source``, recompiling it first when
+    it is missing, older than the text list, or ``rebuild`` is set."""
+    path = os.path.splitext(source)[0] + ".bin"
+    if (
+        rebuild
+        or not os.path.exists(path)
+        or os.path.getmtime(path) < os.path.getmtime(source)
+    ):
+        compile_index(_read_list(source), path)
+    try:
+        return CompiledIndex(path)
+    except ValueError:
+        compile_index(_read_list(source), path)
+        return CompiledIndex(path)
+
+
+class VerdictCache:
+    """Bounded LRU of normalized host -> blocked domain (or None) in front of
+    the global index. It only holds global verdicts, so guild overlays are
+    applied on top of it and editing them never makes an entry stale."""
+
+    def __init__(self, links: CompiledIndex, maxsize: int):
+        self.links = links
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._verdicts: OrderedDict[str, Optional[str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+    def reset(self, links: CompiledIndex) -> None:
+        self.links = links
+        self._verdicts.clear()
+
+    def lookup(self, host: str) -> Optional[str]:
+        try:
+            verdict = self._verdicts[host]
+        except KeyError:
+            self.misses += 1
+            verdict = self._verdicts[host] = self.links.lookup(host)
+            if len(self._verdicts) > self.maxsize:
+                self._verdicts.popitem(last=False)
+        else:
+            self.hits += 1
+            self._verdicts.move_to_end(host)
+        return verdict
+
+
+class LinkOverlay:
+    """Per-guild block and allow sets layered over the shared global index,
+    so guilds never copy the global list. Allowed hosts exempt both layers."""
+
+    def __init__(self, blocked: Iterable[str] = (), allowed: Iterable[str] = ()):
+        self.blocked = DomainIndex(blocked)
+        self.allowed = DomainIndex(allowed)
+
+    def judge(self, hosts: Iterable[tuple[str, Optional[str]]]) -> Optional[str]:
+        """Applies the overlay to ``(host, globally blocked domain)`` pairs."""
+        for host, domain in hosts:
+            if domain is None:
+                domain = self.blocked.lookup(host)
+            if domain is not None and host not in self.allowed:
+                return domain
+        return None
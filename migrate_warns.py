@@ -0,0 +1,61 @@
+"""Moves warnings from the old schema, one "<id>": [reason, date] field per
+warning, to {guild, user, next_id, warns: [{id, reason, date}]}. Members
+with several documents are merged into one. Documents already migrated
+are left alone, so the script can be run again safely."""
+
+import asyncio
+
+from motor import motor_asyncio
+
+from constants import MONGODB_CONNECTION_URI
+
+
+def convert(documents: list[dict]) -> dict:
+    warns = []
+    for document in documents:
+        warns += document.get("warns", [])
+        for key, value in document.items():
+            if key.isdigit():
+                warns.append({"id": int(key), "reason": value[0], "date": value[1]})
+    # IDs of merged documents may collide, so renumber those after the rest
+    seen, unique, clashes = set(), [], []
+    for warn in sorted(warns, key=lambda w: (w["id"], w["date"])):
+        (clashes if warn["id"] in seen else unique).append(warn)
+        seen.add(warn["id"])
+    next_id = max(seen, default=-1) + 1
+    for warn in clashes:
+        warn["id"], next_id = next_id, next_id + 1
+    return {
+        "guild": documents[0]["guild"],
+        "user": documents[0]["user"],
+        "next_id": max(next_id, *(d.get("next_id", 0) for d in documents)),
+        "warns": unique + clashes,
+    }
+
+
+async def main():
+    warns = motor_asyncio.AsyncIOMotorClient(MONGODB_CONNECTION_URI)["security"].warns
+    members = warns.aggregate(
+        [
+            {"$group": {"_id": {"guild": "$guild", "user": "$user"}, "n": {"$sum": 1}}},
+        ]
+    )
+    migrated = 0
+    async for member in members:
+        documents = await warns.find(member["_id"]).sort("_id", 1).to_list(None)
+        old = [
+            d for d in documents if any(k.isdigit() for k in d) or "warns" not in d
+        ]
+        if not old and len(documents) == 1:
+            continue
+        keep = documents[0]["_id"]
+        await warns.replace_one({"_id": keep}, convert(documents))
+        await warns.delete_many({**member["_id"], "_id": {"$ne": keep}})
+        migrated += 1
+
+    await warns.create_index([("guild", 1), ("user", 1)], unique=True)
+    print(f"Migrated warnings of {migrated} members")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
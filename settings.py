@@ -0,0 +1,97 @@
+import sys
+from enum import IntFlag
+from typing import Iterable, NamedTuple
+
+DEFAULT_GUILD_SETTINGS = {
+    "lang": "en",
+    "logs": 0,
+    "joinwatch": 0,
+    "joinrate": {"joins": 10, "seconds": 10},
+    "linkfilter": {
+        "enabled": False,
+        "punishments": [],
+        "blocked": [],
+        "allowed": [],
+    },
+    "antispam": {"enabled": False, "punishments": []},
+}
+
+
+class Punishment(IntFlag):
+    WARN = 1
+    MIN_MUTE = 2
+    HOUR_MUTE = 4
+    DAY_MUTE = 8
+    KICK = 16
+    BAN = 32
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "Punishment":
+        flags = cls(0)
+        for name in names:
+            flags |= cls[name.upper()]
+        return flags
+
+    def names(self) -> list[str]:
+        return [p.name.lower() for p in Punishment if p in self]
+
+
+class JoinRate(NamedTuple):
+    joins: int
+    seconds: int
+
+
+class ModuleSettings:
+    __slots__ = ("enabled", "punishments")
+
+    def __init__(self, document: dict):
+        self.enabled: bool = document.get("enabled", False)
+        self.punishments = Punishment.from_names(document.get("punishments", ()))
+
+    def to_document(self) -> dict:
+        return {"enabled": self.enabled, "punishments": self.punishments.names()}
+
+
+class LinkFilterSettings(ModuleSettings):
+    __slots__ = ("blocked", "allowed")
+
+    def __init__(self, document: dict):
+        super().__init__(document)
+        self.blocked: tuple[str, ...] = tuple(document.get("blocked", ()))
+        self.allowed: tuple[str, ...] = tuple(document.get("allowed", ()))
+
+    def to_document(self) -> dict:
+        document = super().to_document()
+        document["blocked"] = list(self.blocked)
+        document["allowed"] = list(self.allowed)
+        return document
+
+
+class GuildSettings:
+    """Settings of one guild as kept in memory. Punishments are bit flags
+    and lists are tuples, which takes a fraction of the memory of the
+    nested Mongo document. ``to_document`` gives that document back."""
+
+    __slots__ = ("lang", "logs", "joinwatch", "joinrate", "linkfilter", "antispam")
+
+    def __init__(self, document: dict):
+        self.load(document)
+
+    def load(self, document: dict) -> None:
+        document = {**DEFAULT_GUILD_SETTINGS, **document}
+        self.lang: str = sys.intern(document["lang"])
+        self.logs: int = document["logs"]
+        self.joinwatch: int = document["joinwatch"]
+        self.joinrate = JoinRate(**document["joinrate"])
+        self.linkfilter = LinkFilterSettings(document["linkfilter"])
+        self.antispam = ModuleSettings(document["antispam"])
+
+    def to_document(self) -> dict:
+        return {
+            "lang": self.lang,
+            "logs": self.logs,
+            "joinwatch": self.joinwatch,
+            "joinrate": self.joinrate._asdict(),
+            "linkfilter": self.linkfilter.to_document(),
+            "antispam": self.antispam.to_document(),
+        }
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Same setup as the benchmarks: the repo root on the path and as the
+# working directory, and a database URI for MotorClient to parse
+sys.path.insert(0, str(ROOT / "bench"))
+import _env
@@ -0,0 +1,33 @@
+"""Host extraction runs inline for every message in a guild with the link
+filter on, so it has to stay linear in the message length."""
+
+import time
+
+import pytest
+
+from linkfilter import extract_hosts
+
+
+@pytest.mark.parametrize(
+    "content, hosts",
+    [
+        ("hey https://www.google.com/search?q=a", ["www.google.com"]),
+        ("free [nitro](https://gift.evil.xyz/r) now", ["gift.evil.xyz"]),
+        ("<https://github.com/Rapptz/discord.py>", ["github.com", "discord.py"]),
+        ("user@mail.example.org", ["mail.example.org"]),
+        ("a-b.com x_evil.com", ["a-b.com", "evil.com"]),
+        ("just some words", []),
+    ],
+)
+def test_extract_hosts(content, hosts):
+    assert list(extract_hosts(content)) == hosts
+
+
+@pytest.mark.parametrize("token", ["x", "a-", "-", "é", "a.", "-.", "a..b", "a.b_"])
+def test_long_messages_are_scanned_in_linear_time(token):
+    # 20k characters took seconds when every position was retried
+    content = token * (20_000 // len(token))
+    started = time.perf_counter()
+    list(extract_hosts(content))
+    list(extract_hosts(content + "."))
+    assert time.perf_counter() - started < 0.5
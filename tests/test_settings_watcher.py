@@ -0,0 +1,195 @@
+"""SettingsWatcher against change events as a replica set emits them. The
+client never connects: the change stream is replaced by the recorded
+events."""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("motor")
+
+import utils
+from settings import DEFAULT_GUILD_SETTINGS, GuildSettings, Punishment
+
+GUILD = 1234
+NOW = datetime(2026, 1, 1)
+
+
+def update(updated: dict, removed=(), truncated=()) -> dict:
+    return {
+        "_id": {"_data": "8263..."},
+        "operationType": "update",
+        "ns": {"db": "security", "coll": "guilds"},
+        "documentKey": {"_id": GUILD},
+        "updateDescription": {
+            "updatedFields": {**updated, "updated": NOW},
+            "removedFields": list(removed),
+            "truncatedArrays": list(truncated),
+        },
+    }
+
+
+def document(**fields) -> dict:
+    return {"_id": GUILD, **DEFAULT_GUILD_SETTINGS, **fields, "updated": NOW}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = utils.GuildSettingsCache(10)
+    cache._store(
+        GUILD,
+        GuildSettings(
+            {
+                "linkfilter": {
+                    "enabled": True,
+                    "punishments": ["warn"],
+                    "blocked": ["a.com"],
+                    "allowed": [],
+                },
+                "joinrate": {"joins": 5, "seconds": 5},
+            }
+        ),
+    )
+    changed = []
+    monkeypatch.setattr(utils, "settings_listeners", [changed.append])
+    cache.changed = changed
+    yield cache
+    utils.guild_writes._pending.clear()
+    utils.guild_writes._size = 0
+
+
+@pytest.fixture
+def watcher(cache):
+    return utils.SettingsWatcher(cache)
+
+
+def test_update_sets_dotted_fields(cache, watcher):
+    watcher._handle(
+        update({"antispam.enabled": True, "antispam.punishments": ["kick", "ban"]})
+    )
+    settings = cache[GUILD]
+    assert settings.antispam.enabled
+    assert settings.antispam.punishments == Punishment.KICK | Punishment.BAN
+    assert cache.changed == [GUILD]
+
+
+def test_update_appends_to_array_by_index(cache, watcher):
+    watcher._handle(update({"linkfilter.blocked.1": "b.com"}))
+    assert cache[GUILD].linkfilter.blocked == ("a.com", "b.com")
+
+
+def test_removed_fields_fall_back_to_defaults(cache, watcher):
+    watcher._handle(update({}, removed=["joinrate"]))
+    assert cache[GUILD].joinrate.joins == DEFAULT_GUILD_SETTINGS["joinrate"]["joins"]
+
+
+def test_bookkeeping_only_update_changes_nothing(cache, watcher):
+    watcher._handle(update({}))
+    assert cache.changed == []
+
+
+def test_replace_loads_full_document(cache, watcher):
+    watcher._handle(
+        {
+            "operationType": "replace",
+            "documentKey": {"_id": GUILD},
+            "fullDocument": document(lang="en", logs=42),
+        }
+    )
+    assert cache[GUILD].logs == 42
+    assert not cache[GUILD].linkfilter.enabled
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"operationType": "delete", "documentKey": {"_id": GUILD}},
+        update({"linkfilter.blocked": []}, truncated=[{"field": "x", "newSize": 0}]),
+    ],
+)
+def test_delete_and_truncated_arrays_drop_the_guild(cache, watcher, change):
+    watcher._handle(change)
+    assert GUILD not in cache
+
+
+def test_cold_guilds_are_left_to_load(cache, watcher):
+    change = update({"logs": 7})
+    change["documentKey"] = {"_id": 999}
+    watcher._handle(change)
+    assert 999 not in cache
+
+
+def test_guilds_with_queued_writes_are_read_again(cache, watcher, monkeypatch):
+    utils.guild_writes.update({"_id": GUILD}, {"$set": {"logs": 1}})
+    watcher._handle(update({"antispam.enabled": True}))
+    assert GUILD not in cache
+
+    # Loading flushes the queued write first, then reads both changes back
+    calls = []
+
+    async def flush():
+        calls.append("flush")
+        utils.guild_writes._pending.clear()
+
+    async def find_one(query):
+        calls.append("find_one")
+        return document(logs=1, antispam={"enabled": True, "punishments": []})
+
+    monkeypatch.setattr(utils.guild_writes, "flush", flush)
+    guilds = SimpleNamespace(find_one=find_one)
+    monkeypatch.setattr(utils, "db", SimpleNamespace(guilds=guilds))
+    settings = asyncio.run(cache.load(GUILD))
+    assert calls == ["flush", "find_one"]
+    assert settings.logs == 1 and settings.antispam.enabled
+
+
+def test_invalidate_resets_the_resume_token(watcher):
+    watcher._resume_token = {"_data": "old"}
+    watcher._handle({"operationType": "invalidate"})
+    assert watcher._resume_token is None
+
+
+class RecordedStream:
+    def __init__(self, changes: list[dict]):
+        self.changes = changes
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.changes:
+            raise StopAsyncIteration
+        change = self.changes.pop(0)
+        self.resume_token = change.get("_id")
+        return change
+
+
+def test_bad_events_are_skipped_and_the_stream_goes_on(cache, watcher, monkeypatch):
+    other = update({"logs": 7})
+    other["documentKey"] = {"_id": 999}
+    cache._store(999, GuildSettings({}))
+    stream = RecordedStream(
+        [
+            update({"antispam.punishments": ["explode"]}),  # KeyError
+            update({"linkfilter.blocked.x": "c.com"}),  # ValueError
+            {"operationType": "replace", "documentKey": {"_id": GUILD}},  # KeyError
+            other,
+        ]
+    )
+    guilds = SimpleNamespace(watch=lambda resume_after=None: stream)
+    monkeypatch.setattr(utils, "db", SimpleNamespace(guilds=guilds))
+
+    asyncio.run(watcher._watch())
+    assert GUILD not in cache  # Dropped, to be loaded again when used
+    assert cache[999].logs == 7
+    assert watcher._resume_token == other["_id"]
@@ -0,0 +1,102 @@
+"""Every translation key used in the code must exist in langs/en.json and
+be given exactly the placeholders its template expects. load_languages
+already checks the other languages against English at startup."""
+
+import ast
+import json
+import re
+from pathlib import Path
+from string import Formatter
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCES = [*ROOT.glob("*.py"), *ROOT.glob("cogs/*.py")]
+
+
+def flatten(table: dict, prefix: str = "") -> dict[str, str]:
+    flat = {}
+    for key, value in table.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def placeholders(template: str) -> set[str]:
+    return {field for _, field, _, _ in Formatter().parse(template) if field}
+
+
+def substitution(node: ast.expr) -> str:
+    # f"{'on' if enabled else 'off'}" can only be one of its two strings
+    if isinstance(node, ast.IfExp) and all(
+        isinstance(branch, ast.Constant) for branch in (node.body, node.orelse)
+    ):
+        return f"(?:{re.escape(node.body.value)}|{re.escape(node.orelse.value)})"
+    return r"[^.]+"
+
+
+def key_pattern(node: ast.expr) -> re.Pattern | None:
+    """Literal keys match themselves, f-string keys match any key that fills
+    their substitutions with one label each."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return re.compile(re.escape(node.value))
+    if isinstance(node, ast.JoinedStr):
+        parts = [
+            re.escape(part.value)
+            if isinstance(part, ast.Constant)
+            else substitution(part.value)
+            for part in node.values
+        ]
+        return re.compile("".join(parts))
+    return None
+
+
+def translation_calls():
+    """Yields ``(location, key node, keyword names or None)`` for every call
+    of ``_T`` and of functions returned by ``translator``. None means the
+    keywords can't be known (``**kwargs``)."""
+    for path in SOURCES:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        translators = {
+            target.id
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Call)
+            and getattr(node.value.func, "id", None) == "translator"
+            for target in node.targets
+            if isinstance(target, ast.Name)
+        }
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+                continue
+            if node.func.id == "_T" and len(node.args) >= 2:
+                key = node.args[1]
+            elif node.func.id in translators and node.args:
+                key = node.args[0]
+            else:
+                continue
+            keywords = {k.arg for k in node.keywords}
+            location = f"{path.relative_to(ROOT)}:{node.lineno}"
+            yield location, key, None if None in keywords else keywords
+
+
+def test_translation_keys_exist_with_their_placeholders():
+    with open(ROOT / "langs" / "en.json", encoding="utf-8") as f:
+        table = flatten(json.load(f))
+
+    errors = []
+    calls = list(translation_calls())
+    assert calls
+    for location, node, keywords in calls:
+        if (pattern := key_pattern(node)) is None:
+            continue
+        keys = [key for key in table if pattern.fullmatch(key)]
+        if not keys:
+            errors.append(f"{location}: no key matches {pattern.pattern!r}")
+        for key in keys:
+            if keywords is not None and keywords != placeholders(table[key]):
+                errors.append(
+                    f"{location}: {key} takes {sorted(placeholders(table[key]))}, "
+                    f"called with {sorted(keywords)}"
+                )
+    assert not errors, "\n".join(errors)
@@ -1,97 +1,489 @@
+import asyncio
 import contextlib
+import copy
 import json
+import os
+from collections import OrderedDict
 from datetime import datetime
-
-from constants import ADMINS, EMBED_COLOR, LANGUAGES, MONGODB_CONNECTION_URI
-from discord import BanEntry, ButtonStyle, Color, Embed, Guild, Interaction, User
+from string import Formatter
+from typing import Awaitable, Callable, Iterable, Optional
+
+from constants import (
+    ADMINS,
+    EMBED_COLOR,
+    GUILD_CACHE_SIZE,
+    IPC_DIRECTORY,
+    LANGUAGES,
+    MONGODB_CONNECTION_URI,
+    SETTINGS_POLL_INTERVAL,
+    WRITE_FLUSH_INTERVAL,
+)
+from discord import (
+    BanEntry,
+    ButtonStyle,
+    ClientUser,
+    Color,
+    Embed,
+    Guild,
+    Interaction,
+    User,
+    app_commands,
+)
+from discord.abc import Messageable
 from discord.errors import NotFound
 from discord.ext import commands
 from discord.ui import View, button
 from discord.utils import format_dt, utcnow
 from motor import motor_tornado
+from pymongo.errors import OperationFailure, PyMongoError
+
+from cluster import ClusterIPC
+from enforcement import LogBatcher
+from settings import DEFAULT_GUILD_SETTINGS, GuildSettings, Punishment
+from writes import BatchWriter, UpdateQueue
 
 
 # CLASSES
-class MyBot(commands.Bot):
-    def __init__(self, *args, **kwargs):
-        self.translations = load_languages()
+class SettingsTree(app_commands.CommandTree):
+    async def interaction_check(self, i: Interaction) -> bool:
+        if i.guild_id is not None:
+            await guilds_cache.load(i.guild_id)
+        return True
+
+
+class MyBot(commands.AutoShardedBot):
+    def __init__(self, *args, cluster_id: int = 0, cluster_count: int = 1, **kwargs):
+        self.translations = translations
+        kwargs.setdefault("tree_cls", SettingsTree)
         super().__init__(*args, **kwargs)
+        self.cluster_id = cluster_id
+        self.ipc = ClusterIPC(cluster_id, cluster_count, IPC_DIRECTORY)
+        self.settings_watcher = SettingsWatcher(guilds_cache)
+        self.logs = LogBatcher(self.summarize_logs)
 
     async def setup_hook(self):
-        prefs = db.guilds.find({})
-        global guilds_cache
-        guilds_cache = {
-            d["_id"]: {k: v for k, v in d.items() if k != "_id"} async for d in prefs
-        }
+        try:
+            await db.warns.create_index([("guild", 1), ("user", 1)], unique=True)
+        except OperationFailure as e:
+            print(f"Warnings index not created, run migrate_warns.py first: {e}")
+        await self.ipc.start()
+        self.settings_watcher.start()
+        writer.start()
+        # Loaded here so cogs can start their tasks on the bot's event loop
+        for extension in os.listdir("cogs"):
+            if extension.endswith(".py"):
+                await self.load_extension(f"cogs.{extension.removesuffix('.py')}")
+
+    async def close(self):
+        self.logs.stop()
+        self.ipc.close()
+        self.settings_watcher.stop()
+        await writer.close()
+        await super().close()
+
+    async def on_user_update(self, before: User, after: User):
+        # Dispatched from guild member updates, the bot's included
+        if self.user is not None and after.id == self.user.id:
+            _footers.pop(after.id, None)
 
     async def log(self, object_: Interaction | tuple[int, User], msg: str):
+        """Queues a log entry for the guild's logs channel, if it has one.
+        Entries are sent in batches, so this never waits on Discord."""
         if isinstance(object_, Interaction):
             guild_id = object_.guild_id
             user = object_.user
         else:
             guild_id, user = object_
 
-        if channel := self.get_channel(guilds_cache[guild_id]["logs"]):
-            log_embed = embed_info((self, user), msg)
-            log_embed.add_field(
-                name=_T(guild_id, "punishments_log.author"),
-                value=f"{user.name}#{user.discriminator}\nID: ``{user.id}``",
-            )
-            log_embed.set_author(name=user.name, icon_url=user.display_avatar.url)
-            await channel.send(embed=log_embed)
+        settings = await guilds_cache.load(guild_id)
+        if not settings.logs:
+            return
+        channel = self.get_channel(settings.logs)
+        if not isinstance(channel, Messageable):
+            return
+        log_embed = embed_info((self, user), msg)
+        log_embed.add_field(
+            name=_T(guild_id, "punishments_log.author"),
+            value=f"{user.name}#{user.discriminator}\nID: ``{user.id}``",
+        )
+        log_embed.set_author(name=user.name, icon_url=user.display_avatar.url)
+        self.logs.log(channel, log_embed)
+
+    def summarize_logs(self, channel: Messageable, count: int) -> Embed:
+        return embed_info(
+            (self, self.user), _T(channel.guild, "punishments_log.more", count=count)
+        )
 
 
 # DATABASE
 db = motor_tornado.MotorClient(MONGODB_CONNECTION_URI)["security"]
-guilds_cache = {}
+writer = BatchWriter(WRITE_FLUSH_INTERVAL)
+guild_writes: UpdateQueue = writer.add(UpdateQueue(db.guilds))
+
+# Bookkeeping fields of guild documents that aren't settings
+DOCUMENT_FIELDS = ("_id", "updated")
+
+# Callbacks run with the guild ID whenever a guild's settings change
+settings_listeners: list[Callable[[int], None]] = []
+
+
+class GuildSettingsCache:
+    """LRU of guild settings loaded from the database on demand. Event
+    handlers await ``load`` once, after which the settings of that guild
+    are read synchronously. Concurrent loads of the same guild share one
+    query, and guilds without a document get the defaults."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._settings: OrderedDict[int, GuildSettings] = OrderedDict()
+        self._loading: dict[int, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._settings)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._settings
+
+    def __getitem__(self, guild_id: int) -> GuildSettings:
+        settings = self._settings[guild_id]
+        self._settings.move_to_end(guild_id)
+        return settings
+
+    def get(self, guild_id: int) -> GuildSettings:
+        """Returns the settings of a warm guild. For a cold one it starts a
+        load and returns the defaults meanwhile."""
+        try:
+            return self[guild_id]
+        except KeyError:
+            self._start(guild_id)
+            return DEFAULT_SETTINGS
+
+    def discard(self, guild_id: int) -> None:
+        if self._settings.pop(guild_id, None) is not None:
+            settings_changed(guild_id)
+
+    def clear(self) -> None:
+        for guild_id in list(self._settings):
+            self.discard(guild_id)
+
+    def replace(self, guild_id: int, document: dict) -> None:
+        """Loads a newer document into a warm guild, in place so views
+        holding the settings see it too."""
+        if (settings := self._settings.get(guild_id)) is None:
+            return
+        document = GuildSettings(_strip_document(document)).to_document()
+        if document != settings.to_document():
+            settings.load(document)
+            settings_changed(guild_id)
+
+    def apply(self, guild_id: int, updated: dict, removed: Iterable[str]) -> None:
+        """Applies the dotted ``updatedFields``/``removedFields`` of a
+        change event to a warm guild. Cold guilds are left to ``load``."""
+        if (settings := self._settings.get(guild_id)) is None:
+            return
+        document = settings.to_document()
+        for field, value in updated.items():
+            if field in DOCUMENT_FIELDS:
+                continue
+            parent, key = _resolve_path(document, field)
+            if isinstance(parent, list) and key >= len(parent):
+                parent.append(value)
+            else:
+                parent[key] = value
+        for field in removed:
+            parent, key = _resolve_path(document, field)
+            if isinstance(parent, dict):
+                parent.pop(key, None)
+        self.replace(guild_id, document)
+
+    def _store(self, guild_id: int, settings: GuildSettings) -> GuildSettings:
+        # Never replace a warm entry: it may hold changes newer than the
+        # document that was just read.
+        if (current := self._settings.get(guild_id)) is not None:
+            return current
+        self._settings[guild_id] = settings
+        while len(self._settings) > self.maxsize:
+            evicted, _ = self._settings.popitem(last=False)
+            settings_changed(evicted)
+        return settings
+
+    async def load(self, guild_id: int) -> GuildSettings:
+        if (settings := self._settings.get(guild_id)) is not None:
+            self.hits += 1
+            self._settings.move_to_end(guild_id)
+            return settings
+        return await asyncio.shield(self._start(guild_id))
+
+    def _start(self, guild_id: int) -> asyncio.Future:
+        if (pending := self._loading.get(guild_id)) is None:
+            self.misses += 1
+            pending = self._loading[guild_id] = asyncio.ensure_future(
+                self._fetch(guild_id)
+            )
+            pending.add_done_callback(lambda _: self._loading.pop(guild_id, None))
+        return pending
+
+    async def _fetch(self, guild_id: int) -> GuildSettings:
+        if guild_writes.pending({"_id": guild_id}):
+            await guild_writes.flush()
+        if (data := await db.guilds.find_one({"_id": guild_id})) is None:
+            data = copy.deepcopy(DEFAULT_GUILD_SETTINGS)
+            await db.guilds.update_one(
+                {"_id": guild_id},
+                {"$setOnInsert": data, "$currentDate": {"updated": True}},
+                upsert=True,
+            )
+        return self._store(guild_id, GuildSettings(_strip_document(data)))
+
+    async def prefetch(self, guild_ids: Iterable[int], chunk: int = 1000) -> None:
+        """Loads the given guilds in bulk while the cache has room."""
+        room = max(0, self.maxsize - len(self._settings))
+        cold = [g for g in guild_ids if g not in self._settings][:room]
+        for start in range(0, len(cold), chunk):
+            query = {"_id": {"$in": cold[start : start + chunk]}}
+            async for data in db.guilds.find(query):
+                self._store(data["_id"], GuildSettings(_strip_document(data)))
+
+
+def _strip_document(document: dict) -> dict:
+    return {k: v for k, v in document.items() if k not in DOCUMENT_FIELDS}
+
+
+def _resolve_path(settings: dict, field: str) -> tuple[dict | list, str | int]:
+    *parents, key = field.split(".")
+    current = settings
+    for subkey in parents:
+        if isinstance(current, list):
+            current = current[int(subkey)]
+        else:
+            current = current.setdefault(subkey, {})
+    return current, int(key) if isinstance(current, list) else key
+
+
+class SettingsWatcher:
+    """Keeps ``guilds_cache`` coherent with writes made by other bot
+    processes. It follows a change stream on ``db.guilds`` and applies the
+    changed fields to warm guilds. Servers without change streams
+    (standalone mongod) are polled for documents with a newer ``updated``
+    timestamp instead."""
+
+    def __init__(self, cache: GuildSettingsCache):
+        self.cache = cache
+        self.polling = False
+        self._resume_token = None
+        self._since: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                if self.polling:
+                    await self._poll()
+                else:
+                    await self._watch()
+                delay = 1
+            except PyMongoError as e:
+                code = e.code if isinstance(e, OperationFailure) else None
+                if code == 40573:  # Change streams need a replica set
+                    self.polling = True
+                    continue
+                if code == 286:  # Resume point fell off the oplog
+                    self._resume_token = None
+                    self.cache.clear()
+                print(f"Settings watcher: {e}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    async def _watch(self) -> None:
+        async with db.guilds.watch(resume_after=self._resume_token) as stream:
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                try:
+                    self._handle(change)
+                except Exception as e:
+                    self._skip(change.get("documentKey", {}).get("_id"), e)
+
+    def _skip(self, guild_id: Optional[int], error: Exception) -> None:
+        # A change that can't be applied leaves the cached guild unknown, so
+        # it is dropped and loaded again from the database when next used.
+        print(f"Settings watcher: skipped a change to guild {guild_id}: {error!r}")
+        if guild_id is not None:
+            self.cache.discard(guild_id)
+
+    def _handle(self, change: dict) -> None:
+        operation = change["operationType"]
+        if operation == "invalidate":
+            self._resume_token = None
+            return
+        guild_id = change["documentKey"]["_id"]
+        # Applying the change could undo settings still queued here, and
+        # skipping it would lose it, so the guild is read again after they
+        # are flushed
+        if guild_writes.pending({"_id": guild_id}):
+            self.cache.discard(guild_id)
+            return
+        if operation == "update":
+            description = change["updateDescription"]
+            if description.get("truncatedArrays"):
+                self.cache.discard(guild_id)
+            else:
+                self.cache.apply(
+                    guild_id,
+                    description.get("updatedFields", {}),
+                    description.get("removedFields", ()),
+                )
+        elif operation in ("insert", "replace"):
+            self.cache.replace(guild_id, change["fullDocument"])
+        elif operation == "delete":
+            self.cache.discard(guild_id)
+
+    async def _poll(self) -> None:
+        if self._since is None:
+            latest = await db.guilds.find_one(
+                {"updated": {"$exists": True}}, sort=[("updated", -1)]
+            )
+            self._since = latest["updated"] if latest else datetime(1970, 1, 1)
+        while True:
+            await asyncio.sleep(SETTINGS_POLL_INTERVAL)
+            # $gte: writes can share the millisecond of the last one seen
+            async for document in db.guilds.find({"updated": {"$gte": self._since}}):
+                self._since = max(self._since, document["updated"])
+                if guild_writes.pending({"_id": document["_id"]}):
+                    self.cache.discard(document["_id"])
+                    continue
+                try:
+                    self.cache.replace(document["_id"], document)
+                except Exception as e:
+                    self._skip(document["_id"], e)
 
-DEFAULT_GUILD_SETTINGS = {
-    "lang": "en",
-    "logs": 0,
-    "joinwatch": 0,
-    "linkfilter": {"enabled": False, "punishments": []},
-    "antispam": {"enabled": False, "punishments": []},
-}
+
+DEFAULT_SETTINGS = GuildSettings(DEFAULT_GUILD_SETTINGS)
+guilds_cache = GuildSettingsCache(GUILD_CACHE_SIZE)
+
+
+def settings_changed(guild_id: int):
+    for listener in settings_listeners:
+        listener(guild_id)
 
 
 async def set_guild_data(guild_id, field, value):
-    await db.guilds.update_one({"_id": guild_id}, {"$set": {field: value}})
-    fields = field.split(".")
-    current_dict = guilds_cache[guild_id]
-    for subkey in fields[:-1]:
-        current_dict = current_dict[subkey]
-    current_dict[fields[-1]] = value
+    guild_writes.update(
+        {"_id": guild_id},
+        {"$set": {field: value}, "$currentDate": {"updated": True}},
+    )
+    settings = await guilds_cache.load(guild_id)
+    document = settings.to_document()
+    parent, key = _resolve_path(document, field)
+    parent[key] = value
+    settings.load(document)
+    settings_changed(guild_id)
+
+
+async def add_guild_list_item(guild_id, field, value):
+    guild_writes.update(
+        {"_id": guild_id},
+        {"$addToSet": {field: value}, "$currentDate": {"updated": True}},
+    )
+    settings = await guilds_cache.load(guild_id)
+    document = settings.to_document()
+    parent, key = _resolve_path(document, field)
+    if value not in (current := parent.setdefault(key, [])):
+        current.append(value)
+    settings.load(document)
+    settings_changed(guild_id)
+
+
+async def remove_guild_list_item(guild_id, field, value):
+    guild_writes.update(
+        {"_id": guild_id},
+        {"$pull": {field: value}, "$currentDate": {"updated": True}},
+    )
+    settings = await guilds_cache.load(guild_id)
+    document = settings.to_document()
+    parent, key = _resolve_path(document, field)
+    if value in (current := parent.setdefault(key, [])):
+        current.remove(value)
+    settings.load(document)
+    settings_changed(guild_id)
 
 
 async def set_default_prefs(guild_id: int):
-    if (data := await db.guilds.find_one({"_id": guild_id})) is None:
-        settings = DEFAULT_GUILD_SETTINGS.copy()
-        settings["_id"] = guild_id
-        await db.guilds.insert_one(settings)
-        guilds_cache[guild_id] = settings
-    else:
-        del data["_id"]
-        guilds_cache[guild_id] = data
+    guilds_cache.discard(guild_id)
+    await guilds_cache.load(guild_id)
+    settings_changed(guild_id)
 
 
-def get_punishments(guild_id: int, category: str):
-    return guilds_cache[guild_id][category]["punishments"]
+def get_punishments(guild_id: int, category: str) -> Punishment:
+    return get_guild_prefs(guild_id, category).punishments
 
 
 def get_guild_prefs(guild_id: int, key):
-    return guilds_cache[guild_id][key]
+    return getattr(guilds_cache.get(guild_id), key)
 
 
 # TRANSLATIONS
-def load_languages():
-    translations = {}
+def flatten_language(table: dict, prefix: str = "") -> dict[str, str]:
+    flat = {}
+    for key, value in table.items():
+        if isinstance(value, dict):
+            flat.update(flatten_language(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def placeholders(template: str) -> set[str]:
+    return {field for _, field, _, _ in Formatter().parse(template) if field}
+
+
+def load_languages() -> tuple[dict[str, dict[str, str]], frozenset[str]]:
+    """Loads every language as a flat ``dotted.key -> template`` table.
+    Each one must have exactly the keys and placeholders of English, so a
+    broken language file fails at startup rather than mid command. Also
+    returns the keys whose templates have placeholders."""
+    tables = {}
     for lang in LANGUAGES.values():
         with open(f"langs/{lang}.json", "r", encoding="utf-8") as f:
-            translations[lang] = json.load(f)
-    return translations
+            tables[lang] = flatten_language(json.load(f))
+
+    base = tables["en"]
+    templated = frozenset(key for key, t in base.items() if placeholders(t))
+    errors = []
+    for lang, table in tables.items():
+        errors += [f"{lang}: missing {key}" for key in base.keys() - table.keys()]
+        errors += [f"{lang}: unknown {key}" for key in table.keys() - base.keys()]
+        errors += [
+            f"{lang}: {key} has placeholders {sorted(placeholders(table[key]))}, "
+            f"expected {sorted(placeholders(base[key]))}"
+            for key in base.keys() & table.keys()
+            if placeholders(table[key]) != placeholders(base[key])
+        ]
+    if errors:
+        raise ValueError("Invalid translations:\n" + "\n".join(sorted(errors)))
 
+    # Templates without placeholders are formatted once here
+    for table in tables.values():
+        for key, template in table.items():
+            if key not in templated:
+                table[key] = template.format()
+    return tables, templated
 
-translations = load_languages()
+
+# Templates of ``templated_keys`` are always formatted, so a missing
+# placeholder raises instead of shipping "{member}" to users
+translations, templated_keys = load_languages()
 
 
 def _T(
@@ -99,17 +491,29 @@ def _T(
     key: str,
     **kwargs,
 ) -> str:
-    guild_id = get_guild_id(object_)
-    lang = guilds_cache[guild_id]["lang"]
+    template = translations[guilds_cache.get(get_guild_id(object_)).lang][key]
+    return template.format(**kwargs) if key in templated_keys else template
+
+
+def translator(
+    object_: Interaction | commands.Context | Guild | int,
+) -> Callable[..., str]:
+    """``_T`` bound to the guild's language, for call sites that translate
+    several keys in a row."""
+    table = translations[guilds_cache.get(get_guild_id(object_)).lang]
 
-    keys = key.split(".")
-    value = translations[lang]
-    for k in keys:
-        value: dict | str = value[k]
-    return value.format(**kwargs)
+    def translate(key: str, **kwargs) -> str:
+        template = table[key]
+        return template.format(**kwargs) if key in templated_keys else template
+
+    return translate
 
 
 def get_guild_id(object_):
+    # IDs come from the message and punishment paths, the hottest callers,
+    # and the class checks below cost more than the lookups they feed
+    if type(object_) is int:
+        return object_
     if isinstance(object_, (Interaction, commands.Context)):
         return object_.guild.id
     elif isinstance(object_, Guild):
@@ -119,53 +523,56 @@ def get_guild_id(object_):
 
 
 # FORMAT
-def embed_info(
-    object_: Interaction | tuple[MyBot, User] | commands.Context, message: str
+FAIL_COLOR = Color.red()
+SUCCESS_COLOR = Color.green()
+
+# Bot user ID -> (name, avatar URL), dropped by MyBot.on_user_update
+_footers: dict[int, tuple[str, str]] = {}
+
+
+def bot_footer(bot_user: ClientUser) -> tuple[str, str]:
+    """Name and avatar URL of the bot for embed footers. ``display_avatar``
+    builds a new asset and URL on every access, so they are built once and
+    again only after Discord reports a change to the bot's profile."""
+    if (cached := _footers.get(bot_user.id)) is None:
+        cached = _footers[bot_user.id] = (
+            bot_user.name,
+            bot_user.display_avatar.url,
+        )
+    return cached
+
+
+def _make_embed(
+    object_: Interaction | tuple[MyBot, User] | commands.Context,
+    message: Optional[str],
+    color: int | Color,
 ) -> Embed:
     if isinstance(object_, Interaction):
-        bot_name = object_.client.user.name
-        author = object_.user.name
-        icon = object_.client.user.display_avatar.url
+        bot_user, author = object_.client.user, object_.user.name
     elif isinstance(object_, commands.Context):
-        icon = object_.bot.user.display_avatar.url
-        bot_name = object_.bot.user.name
-        author = object_.author.name
+        bot_user, author = object_.bot.user, object_.author.name
     else:
         bot, user = object_
-        author = user.name
-        bot_name = bot.user.name
-        icon = bot.user.display_avatar.url
-    embed = Embed(description=message, color=EMBED_COLOR, timestamp=utcnow())
+        bot_user, author = bot.user, user.name
+    bot_name, icon = bot_footer(bot_user)
+    embed = Embed(description=message, color=color, timestamp=utcnow())
     embed.set_footer(icon_url=icon, text=f"{bot_name} | {author}")
     return embed
 
 
+def embed_info(
+    object_: Interaction | tuple[MyBot, User] | commands.Context,
+    message: Optional[str] = None,
+) -> Embed:
+    return _make_embed(object_, message, EMBED_COLOR)
+
+
 def embed_fail(object_: commands.Context | Interaction, message: str) -> Embed:
-    if isinstance(object_, Interaction):
-        icon = object_.client.user.display_avatar.url
-        bot_name = object_.client.user.name
-        author = object_.user.name
-    else:
-        icon = object_.bot.user.display_avatar.url
-        bot_name = object_.bot.user.name
-        author = object_.author.name
-    embed = Embed(description=message, color=Color.red(), timestamp=utcnow())
-    embed.set_footer(icon_url=icon, text=f"{bot_name} | {author}")
-    return embed
+    return _make_embed(object_, message, FAIL_COLOR)
 
 
 def embed_success(object_: Interaction | commands.Context, message: str) -> Embed:
-    if isinstance(object_, Interaction):
-        icon = object_.client.user.display_avatar.url
-        bot_name = object_.client.user.name
-        author = object_.user.name
-    else:
-        icon = object_.bot.user.display_avatar.url
-        bot_name = object_.bot.user.name
-        author = object_.author.name
-    embed = Embed(description=message, color=Color.green(), timestamp=utcnow())
-    embed.set_footer(icon_url=icon, text=f"{bot_name} | {author}")
-    return embed
+    return _make_embed(object_, message, SUCCESS_COLOR)
 
 
 # CHECKS
@@ -179,82 +586,100 @@ def is_admin(object_: Interaction | commands.Context):
 
 
 # PAGINATOR
+# (skip, limit) -> (that page's items, total item count)
+PageFetcher = Callable[[int, int], Awaitable[tuple[list, int]]]
+
+
 class Paginator:
     def __init__(
         self,
         interaction: Interaction,
-        objects: dict[str, set[str, datetime]] | list[BanEntry],
+        objects: list[dict] | list[BanEntry] = None,
         username=None,
+        fetch: PageFetcher = None,
         **kwargs,
     ) -> None:
+        """Pages through ``objects``, or through pages queried one at a time
+        with ``fetch`` so only the page on screen is ever held."""
         self.username = username
         self.i: Interaction = interaction
         self.ITEMS_PER_PAGE = 10
-        self.type_ = "warnings" if isinstance(objects, dict) else "bans"
-        self.objects: dict = objects
-        self.view = (
-            PaginatorView(self.i, self, timeout=30)
-            if len(self.objects) > self.ITEMS_PER_PAGE
-            else None
-        )
-
+        self.type_ = "warnings" if fetch else "bans"
+        self.objects: list = objects or []
+        self.fetch = fetch
+        self.view: Optional[PaginatorView] = None
         self.page = kwargs.get("page", 1)
-        calculation = len(self.objects) / self.ITEMS_PER_PAGE
-        self.total_pages = (
-            int(calculation) if calculation.is_integer() else int(calculation) + 1
+        self.total_pages = 1
+        if fetch is None:
+            self._paginate(len(self.objects))
+
+    def _paginate(self, total: int) -> None:
+        self.total_pages = max(1, -(-total // self.ITEMS_PER_PAGE))
+        if self.view is None and total > self.ITEMS_PER_PAGE:
+            self.view = PaginatorView(self.i, self, timeout=30)
+
+    async def _load_page(self) -> None:
+        self.objects, total = await self.fetch(
+            (self.page - 1) * self.ITEMS_PER_PAGE, self.ITEMS_PER_PAGE
         )
-        if self.total_pages == 0:
-            self.total_pages = 1
-
-    def _get_cards(self) -> "list[dict]":
+        self._paginate(total)
+        # Warnings removed since the last page may have emptied this one
+        if not self.objects and self.page > self.total_pages:
+            self.page = self.total_pages
+            await self._load_page()
+
+    def _get_cards(self) -> list:
+        if self.fetch:
+            return self.objects
         return self.objects[
             (self.page - 1) * self.ITEMS_PER_PAGE : self.page * self.ITEMS_PER_PAGE
         ]
 
     def _build_warnings_embed(self):
+        t = translator(self.i)
         embed = Embed(
-            description="" if self.objects else _T(self.i, "warnings.display.no_warns"),
+            description="" if self.objects else t("warnings.display.no_warns"),
             color=EMBED_COLOR,
             timestamp=utcnow(),
         )
-        for num, dict_ in self.objects.items():
-            reason = f"{_T(self.i, 'warnings.display.reason')}: {dict_[0]}"
-            date = f"{_T(self.i, 'warnings.display.date')}: {format_dt(dict_[1])}"
+        for warn in self._get_cards():
+            reason = f"{t('warnings.display.reason')}: {warn['reason']}"
+            date = f"{t('warnings.display.date')}: {format_dt(warn['date'])}"
             embed.add_field(
-                name=f"ID: {num}",
+                name=f"ID: {warn['id']}",
                 value=f"{reason}\n{date}",
                 inline=False,
             )
-            embed.set_footer(
-                text=f"{_T(self.i, 'warnings.display.page')} {self.page}/{self.total_pages}"
-            )
-            embed.set_author(
-                name=f"{_T(self.i, 'warnings.display.title')} {self.username}",
-                icon_url=self.i.user.display_avatar.url,
-            )
+        embed.set_footer(
+            text=f"{t('warnings.display.page')} {self.page}/{self.total_pages}"
+        )
+        embed.set_author(
+            name=f"{t('warnings.display.title')} {self.username}",
+            icon_url=self.i.user.display_avatar.url,
+        )
         return embed
 
     def _build_bans_embed(self):
         self.objects: list[BanEntry]
+        t = translator(self.i)
         embed = Embed(
-            description="" if self.objects else _T(self.i, "moderation.bans.no_bans"),
+            description="" if self.objects else t("moderation.bans.no_bans"),
             color=EMBED_COLOR,
             timestamp=utcnow(),
         )
-        for ban in self.objects:
+        for ban in self._get_cards():
             embed.add_field(
                 name=f"ID: {ban.user.id}",
-                value=f"{_T(self.i, 'moderation.bans.reason')}: {ban.reason or '---'}",
+                value=f"{t('moderation.bans.reason')}: {ban.reason or '---'}",
                 inline=False,
             )
-
-            embed.set_footer(
-                text=f"{_T(self.i, 'moderation.bans.page')} {self.page}/{self.total_pages}"
-            )
-            embed.set_author(
-                name=_T(self.i, "moderation.bans.title"),
-                icon_url=self.i.user.display_avatar.url,
-            )
+        embed.set_footer(
+            text=f"{t('moderation.bans.page')} {self.page}/{self.total_pages}"
+        )
+        embed.set_author(
+            name=t("moderation.bans.title"),
+            icon_url=self.i.user.display_avatar.url,
+        )
         return embed
 
     @property
@@ -265,6 +690,8 @@ class Paginator:
             return self._build_bans_embed()
 
     async def send_message(self, i: Interaction):
+        if self.fetch:
+            await self._load_page()
         if not i.command:
             self.view.update_buttons()
             await i.followup.edit_message(
@@ -0,0 +1,203 @@
+import asyncio
+import copy
+from abc import ABC, abstractmethod
+import time
+from typing import Any, Hashable, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+
+# (document key, queued items, bulk write request for those items)
+Request = tuple[Hashable, list, Any]
+
+MERGEABLE = {"$set", "$currentDate"}
+
+
+def _merge(target: dict, update: dict) -> bool:
+    """Folds ``update`` into the queued ``target`` update if both only set
+    fields and no field is a parent of another (MongoDB rejects those)."""
+    if not (target.keys() | update.keys()) <= MERGEABLE:
+        return False
+    queued = {f for fields in target.values() for f in fields}
+    for fields in update.values():
+        for field in fields:
+            if any(field.startswith(f"{q}.") for q in queued):
+                return False
+    for op, fields in update.items():
+        for field in fields:
+            for q in [q for q in queued if q.startswith(f"{field}.")]:
+                for queued_fields in target.values():
+                    queued_fields.pop(q, None)
+        target.setdefault(op, {}).update(fields)
+    return True
+
+
+class WriteQueue(ABC):
+    """Writes to one collection that are held back and sent together with
+    a single ``bulk_write``. Items are queued per document key, keeping the
+    order of writes to the same document. Batches that fail on a transient
+    error are queued again in front of newer writes, up to ``max_attempts``
+    flushes in a row. Writes the server rejects are dropped."""
+
+    def __init__(self, collection, max_pending: int = 1000, max_attempts: int = 5):
+        self.collection = collection
+        self.name: str = collection.name
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+        self._size = 0
+        self._failures = 0
+        self._pending: dict[Hashable, list] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    @property
+    def average_latency(self) -> float:
+        return self._total_latency / self.flushes if self.flushes else 0.0
+
+    def _push(self, key: Hashable, item: Any) -> None:
+        self._pending.setdefault(key, []).append(item)
+        self._size += 1
+        if self._size >= self.max_pending and not self._lock.locked():
+            task = asyncio.create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _restore(self, requests: list[tuple[Hashable, list]]) -> None:
+        restored: dict[Hashable, list] = {}
+        for key, items, *_ in requests:
+            restored.setdefault(key, []).extend(items)
+        for key, items in restored.items():
+            self._pending[key] = items + self._pending.get(key, [])
+            self._size += len(items)
+
+    def _drop(self, batch: dict[Hashable, list], error: PyMongoError) -> None:
+        count = sum(map(len, batch.values()))
+        print(f"Dropped {count} writes to {self.name}: {error}")
+        self.dropped += count
+        self._failures = 0
+
+    @abstractmethod
+    async def _requests(self, batch: dict[Hashable, list]) -> list[Request]:
+        """Turns queued items into bulk write requests, in order."""
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._size = 0
+            start = time.perf_counter()
+            try:
+                requests = await self._requests(batch)
+                await self.collection.bulk_write(
+                    [request for *_, request in requests], ordered=True
+                )
+            except BulkWriteError as e:
+                # Ordered: everything before the failed write was applied
+                error = e.details["writeErrors"][0]
+                index = error["index"]
+                print(f"Dropped a write to {self.name}: {error['errmsg']}")
+                self.dropped += len(requests[index][1])
+                self._restore(requests[index + 1 :])
+                applied = requests[:index]
+            except PyMongoError as e:
+                # A batch the server rejects as a whole (auth, validation, a
+                # bad update) would fail the same way every time
+                rejected = isinstance(e, OperationFailure) and not e.has_error_label(
+                    "RetryableWriteError"
+                )
+                self._failures += 1
+                if rejected or self._failures >= self.max_attempts:
+                    self._drop(batch, e)
+                    return
+                self._restore(list(batch.items()))
+                raise
+            else:
+                applied = requests
+            self._failures = 0
+            latency = time.perf_counter() - start
+            self.flushes += 1
+            self.written += sum(len(items) for _, items, _ in applied)
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+            self._total_latency += latency
+
+
+class UpdateQueue(WriteQueue):
+    """Queues ``update_one`` calls. Consecutive ``$set`` updates of the same
+    document are merged into one."""
+
+    def update(self, filter_: dict, update: dict, upsert: bool = False) -> None:
+        key = tuple(sorted(filter_.items()))
+        update = copy.deepcopy(update)
+        items = self._pending.get(key)
+        if items and items[-1][2] == upsert and _merge(items[-1][1], update):
+            return
+        self._push(key, (filter_, update, upsert))
+
+    def pending(self, filter_: dict) -> bool:
+        return tuple(sorted(filter_.items())) in self
+
+    async def _requests(self, batch: dict[Hashable, list]) -> list[Request]:
+        return [
+            (key, [item], UpdateOne(item[0], item[1], upsert=item[2]))
+            for key, items in batch.items()
+            for item in items
+        ]
+
+
+class BatchWriter:
+    """Flushes its queues every ``interval`` seconds and once more when
+    closed, so queued writes survive a clean shutdown."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.queues: dict[str, WriteQueue] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, queue: WriteQueue) -> WriteQueue:
+        self.queues[queue.name] = queue
+        return queue
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def flush(self) -> None:
+        errors = await asyncio.gather(
+            *(queue.flush() for queue in self.queues.values()),
+            return_exceptions=True,
+        )
+        for error in errors:
+            if isinstance(error, Exception):
+                print(f"Batch write failed, will retry: {error}")
+
+    async def close(self, attempts: int = 3) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for attempt in range(attempts):
+            await self.flush()
+            if not any(self.queues.values()):
+                return
+            await asyncio.sleep(2**attempt)
+        for queue in self.queues.values():
+            if queue:
+                print(f"Lost {len(queue)} queued writes to {queue.name}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()